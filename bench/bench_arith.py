@@ -0,0 +1,24 @@
+# Time operator dispatch on an arithmetic-heavy loop, for every engine.
+# Usage: python bench/bench_arith.py [repeat]
+import io, os, sys, time
+from contextlib import redirect_stdout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+from Lox import Lox, ENGINES
+
+def run(source, engine):
+    lox = Lox(engine)
+    statements = lox.parse(source)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        lox.execute(statements)
+    return time.perf_counter() - start
+
+def main(argv):
+    repeat = int(argv[1]) if len(argv) > 1 else 5
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "arith.lox")) as file:
+        source = file.read()
+    for engine in ENGINES:
+        print(f"{engine:8} {min(run(source, engine) for _ in range(repeat)):.3f}s")
+
+if __name__ == "__main__":
+    main(sys.argv)
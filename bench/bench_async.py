@@ -0,0 +1,56 @@
+# Hundreds of scripts at once on the asyncio host (AsyncHost.py): a few
+# long-running loops among many short scripts. Reports throughput and the
+# latency of the short scripts for several slice sizes; without yielding
+# the short scripts queue up behind the long ones.
+# Usage: python bench/bench_async.py [short scripts] [long scripts]
+import asyncio, os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+import AsyncHost, Embed
+
+SHORT = """
+var total = 0;
+for (var i = 0; i < n; i = i + 1) total = total + i;
+put total;
+"""
+
+LONG = """
+var i = 0;
+while (i < 100000) i = i + 1;
+put i;
+"""
+
+NO_YIELD = 10 ** 12
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+async def timed(source, inputs, steps, start):
+    result = await AsyncHost.run(source, inputs, steps)
+    if result.status != 0: raise RuntimeError(result.output)
+    return time.perf_counter() - start
+
+async def host(short, long, steps):
+    start = time.perf_counter()
+    # the long scripts are submitted first, so they are never behind the short ones
+    tasks = [timed(LONG, None, steps, start) for _ in range(long)]
+    tasks += [timed(SHORT, {"n": 50 + i % 50}, steps, start) for i in range(short)]
+    latencies = await asyncio.gather(*tasks)
+    return time.perf_counter() - start, latencies[long:]
+
+def main(argv):
+    short = int(argv[1]) if len(argv) > 1 else 400
+    long = int(argv[2]) if len(argv) > 2 else 4
+    start = time.perf_counter()
+    for _ in range(long): Embed.run(LONG, None, "stack")
+    for i in range(short): Embed.run(SHORT, {"n": 50 + i % 50}, "stack")
+    sequential = time.perf_counter() - start
+    print(f"{short} short + {long} long scripts")
+    print(f"one after the other (Embed.run)  {sequential:.3f}s  {(short + long) / sequential:6.0f} scripts/s")
+    for steps in (100, 1000, 10000, NO_YIELD):
+        elapsed, latencies = asyncio.run(host(short, long, steps))
+        label = "no yielding" if steps == NO_YIELD else f"{steps} steps"
+        print(f"host, {label:12} {elapsed:.3f}s  {(short + long) / elapsed:6.0f} scripts/s  short latency p50 {percentile(latencies, 0.5) * 1000:7.1f} ms  p95 {percentile(latencies, 0.95) * 1000:7.1f} ms  max {max(latencies) * 1000:7.1f} ms")
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,51 @@
+# Many small scripts run by the batch runner with 1..N worker processes,
+# against one `python Lox.py` process per script.
+# Usage: python bench/bench_batch.py [scripts] [max workers]
+import os, sys, time, tempfile, subprocess
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "lox"))
+from Batch import runBatch
+
+SOURCE = """
+fun fib(n) {{ if (n <= 1) return n; return fib(n - 2) + fib(n - 1); }}
+var total = 0;
+for (var i = 0; i < 200; i = i + 1) total = total + i * {seed};
+put fib(14) + total;
+"""
+
+def writeScripts(directory, count):
+    paths = []
+    for seed in range(count):
+        path = os.path.join(directory, f"script{seed}.lox")
+        with open(path, "w") as file:
+            file.write(SOURCE.format(seed=seed))
+        paths.append(path)
+    return paths
+
+def runProcesses(paths):
+    lox = os.path.join(HERE, "..", "lox", "Lox.py")
+    for path in paths:
+        subprocess.run([sys.executable, lox, "--no-cache", path], stdout=subprocess.DEVNULL, check=True)
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 48
+    maxWorkers = int(argv[2]) if len(argv) > 2 else max(os.cpu_count(), 4)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = writeScripts(directory, count)
+        start = time.perf_counter()
+        runProcesses(paths)
+        single = time.perf_counter() - start
+        print(f"{count} scripts, {os.cpu_count()} CPUs")
+        print(f"one process per script  {single:.3f}s")
+        base = None
+        for workers in range(1, maxWorkers + 1):
+            start = time.perf_counter()
+            results = runBatch(paths, ["--no-cache"], workers)
+            elapsed = time.perf_counter() - start
+            if any(result["status"] != 0 for result in results):
+                raise RuntimeError("a script failed")
+            base = base or elapsed
+            print(f"batch, {workers:2} workers      {elapsed:.3f}s  {count / elapsed:7.1f} scripts/s  speedup {base / elapsed:.2f}x")
+
+if __name__ == "__main__":
+    main(sys.argv)
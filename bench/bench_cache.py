@@ -0,0 +1,36 @@
+# Cold (scan + parse + store) vs warm (load from __loxcache__) startup.
+# Usage: python bench/bench_cache.py [functions]
+import io, os, sys, time, tempfile
+from contextlib import redirect_stdout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+from Lox import Lox
+from Cache import ProgramCache
+
+def generate(functions):
+    lines = []
+    for i in range(functions):
+        lines.append(f"fun f{i}(a, b) {{ var c = (a + b) * {i}; if (c > 10) {{ return c - 1; }} return c; }}")
+    lines.append(f"put f{functions - 1}(1, 2);")
+    return "\n".join(lines)
+
+def run(source, cache):
+    lox = Lox()
+    lox.cache = cache
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        lox.run(source)
+    return time.perf_counter() - start
+
+def main(argv):
+    functions = int(argv[1]) if len(argv) > 1 else 2000
+    source = generate(functions)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ProgramCache(directory)
+        uncached = run(source, None)
+        cold = run(source, cache)
+        warm = min(run(source, cache) for _ in range(3))
+    print(f"{len(source)} bytes, {functions} functions")
+    print(f"no cache {uncached:.3f}s  cold {cold:.3f}s  warm {warm:.3f}s  speedup {uncached / warm:.2f}x")
+
+if __name__ == "__main__":
+    main(sys.argv)
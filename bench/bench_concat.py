@@ -0,0 +1,38 @@
+# Building a string with `s = s + x` in a loop, with ropes (Rope.py) and
+# with plain Python string concatenation, on every engine.
+# Usage: python bench/bench_concat.py [iterations]
+import io, os, sys, time
+from contextlib import redirect_stdout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+import Rope
+from Lox import Lox, ENGINES
+
+SOURCE = """
+var s = "";
+for (var i = 0; i < {n}; i = i + 1) s = s + "ab";
+put s == s;
+"""
+
+def run(source, engine, ropeMin):
+    Rope.ROPE_MIN = ropeMin
+    lox = Lox()
+    lox.engine = engine
+    statements = lox.parse(source)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        lox.execute(statements)
+    return time.perf_counter() - start
+
+def main(argv):
+    n = int(argv[1]) if len(argv) > 1 else 100000
+    source = SOURCE.replace("{n}", str(n))
+    ropeMin = Rope.ROPE_MIN
+    print(f"{n} appends of 2 characters")
+    for engine in ENGINES:
+        # with an infinite threshold no string ever becomes a rope
+        plain = run(source, engine, float("inf"))
+        ropes = run(source, engine, ropeMin)
+        print(f"{engine:8} plain {plain:.3f}s  ropes {ropes:.3f}s  speedup {plain / ropes:.1f}x")
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,33 @@
+# Cost of embedding: creating interpreters, and a whole Embed.run() per
+# request with and without the in-memory program cache.
+# Usage: python bench/bench_embed.py [requests]
+import os, sys, timeit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+import Embed
+from Lox import Lox, Interpreter
+from Cache import MemoryCache
+
+REQUEST = """
+var total = 0;
+for (var i = 0; i < count; i = i + 1) total = total + i;
+put greeting + " world";
+"""
+
+def perCall(function, number):
+    # microseconds, best of 5
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+def main(argv):
+    n = int(argv[1]) if len(argv) > 1 else 5000
+    inputs = {"count": 10, "greeting": "hello"}
+    print(f"Interpreter()             {perCall(Interpreter, n):8.1f} us")
+    print(f"Lox()                     {perCall(Lox, n):8.1f} us")
+    Embed.programs = None
+    uncached = perCall(lambda: Embed.run(REQUEST, inputs), n)
+    Embed.programs = MemoryCache()
+    cached = perCall(lambda: Embed.run(REQUEST, inputs), n)
+    print(f"run(), parsing every time {uncached:8.1f} us  {1e6 / uncached:8.0f} requests/s")
+    print(f"run(), program cache      {cached:8.1f} us  {1e6 / cached:8.0f} requests/s")
+
+if __name__ == "__main__":
+    main(sys.argv)
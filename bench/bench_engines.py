@@ -0,0 +1,26 @@
+# Compare the tree-walking Interpreter with the other execution engines.
+# Usage: python bench/bench_engines.py [repeat]
+import io, os, sys, time
+from contextlib import redirect_stdout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+from Lox import Lox, ENGINES
+
+def run(source, engine):
+    lox = Lox(engine)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        lox.run(source)
+    return time.perf_counter() - start
+
+def main(argv):
+    repeat = int(argv[1]) if len(argv) > 1 else 3
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in ("fib.lox", "nested.lox"):
+        with open(os.path.join(here, name)) as file:
+            source = file.read()
+        times = {engine: min(run(source, engine) for _ in range(repeat)) for engine in ENGINES}
+        report = "  ".join(f"{engine} {seconds:.3f}s ({times['tree'] / seconds:.2f}x)" for engine, seconds in times.items())
+        print(f"{name:12} {report}")
+
+if __name__ == "__main__":
+    main(sys.argv)
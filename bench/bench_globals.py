@@ -0,0 +1,54 @@
+# Global lookups from a hot loop: calls to top-level functions and natives,
+# and reads of a global that is never reassigned.
+# Usage: python bench/bench_globals.py [iterations]
+import io, os, sys, time
+from contextlib import redirect_stdout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+from Lox import Lox
+
+PROGRAMS = (
+    ("user fun", """
+fun one() { return 1; }
+fun loop(n) { var total = 0; for (var i = 0; i < n; i = i + 1) total = total + one(); return total; }
+put loop({n});
+"""),
+    ("native", """
+fun loop(n) { var t = 0; for (var i = 0; i < n; i = i + 1) t = clock(); return t; }
+put loop({n});
+"""),
+    ("global read", """
+var step = 1;
+fun loop(n) { var total = 0; for (var i = 0; i < n; i = i + 1) total = total + step; return total; }
+put loop({n});
+"""),
+)
+
+def run(source):
+    lox = Lox()
+    statements = lox.parse(source)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        lox.execute(statements)
+    return time.perf_counter() - start
+
+def lookups(n):
+    # the lookup alone: evaluate one resolved global Variable node n times
+    lox = Lox()
+    statements = lox.parse("fun one() { return 1; }\none;")
+    lox.execute(statements)
+    evaluate, expr = lox.interpreter.evaluate, statements[1].expression
+    start = time.perf_counter()
+    for _ in range(n):
+        evaluate(expr)
+    return time.perf_counter() - start
+
+def main(argv):
+    n = int(argv[1]) if len(argv) > 1 else 100000
+    seconds = min(lookups(n * 10) for _ in range(5))
+    print(f"{'lookup':12} {n * 10} lookups  {seconds:.3f}s  {seconds / (n * 10) * 1e9:.0f} ns/lookup")
+    for name, source in PROGRAMS:
+        seconds = min(run(source.replace("{n}", str(n))) for _ in range(3))
+        print(f"{name:12} {n} iterations  {seconds:.3f}s  {n / seconds:,.0f} iterations/s")
+
+if __name__ == "__main__":
+    main(sys.argv)
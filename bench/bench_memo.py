@@ -0,0 +1,35 @@
+# Recursive fib with and without memoization of pure functions (--memo).
+# Usage: python bench/bench_memo.py [n]
+import io, os, sys, time
+from contextlib import redirect_stdout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+from Lox import Lox, MEMO_SIZE
+
+SOURCE = """
+fun fib(n) { if (n <= 1) return n; return fib(n - 2) + fib(n - 1); }
+put fib({n});
+"""
+
+def run(source, memoSize):
+    lox = Lox()
+    lox.interpreter.memoSize = memoSize
+    statements = lox.parse(source)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        lox.execute(statements)
+    return time.perf_counter() - start, lox.interpreter.memoStats()
+
+def main(argv):
+    n = int(argv[1]) if len(argv) > 1 else 22
+    source = SOURCE.replace("{n}", str(n))
+    plain, _ = run(source, 0)
+    memoized, stats = run(source, MEMO_SIZE)
+    print(f"fib({n})  plain {plain:.3f}s  memo {memoized:.4f}s  speedup {plain / memoized:.0f}x")
+    for name, counters in stats.items():
+        print(f"  {name}: {counters}")
+    # a cache far smaller than the working set still has to give the right answer
+    tiny, stats = run(source, 2)
+    print(f"memo size 2  {tiny:.3f}s  {stats['<fn fib>']}")
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,63 @@
+# Bytes per AST node / Token with __slots__ versus plain __dict__ instances.
+# The "before" figure rebuilds the same object graph out of unslotted classes
+# with the same fields, which is what tool/Expr_gen.py used to generate.
+# Usage: python bench/bench_memory.py [functions]
+import gc, os, sys, tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+from Lox import Lox, Scanner, Parser
+from Token import Token
+import Expr, Stmt
+
+NODE_CLASSES = [Token] + [cls for module in (Expr, Stmt) for cls in vars(module).values()
+                          if isinstance(cls, type) and hasattr(cls, "__slots__") and cls.__slots__]
+PLAIN = {cls: type("Plain" + cls.__name__, (), {}) for cls in NODE_CLASSES}
+
+def unslotted(value, tokens=True):
+    # tokens inside the tree are shared with the token list, so the tree walk
+    # leaves them alone and the token list is converted on its own
+    if isinstance(value, list):
+        return [unslotted(item, tokens) for item in value]
+    plain = PLAIN.get(type(value))
+    if plain is None or (not tokens and type(value) is Token):
+        return value
+    copy = plain()
+    for field in type(value).__slots__:
+        setattr(copy, field, unslotted(getattr(value, field), tokens))
+    return copy
+
+def count(value):
+    if isinstance(value, list):
+        return sum(count(item) for item in value)
+    if type(value) in PLAIN and type(value) is not Token:
+        return 1 + sum(count(getattr(value, field)) for field in type(value).__slots__)
+    return 0
+
+def generate(functions):
+    return "\n".join(f"fun f{i}(a, b) {{ var c = (a + b) * {i}; if (c > 10) {{ return c - 1; }} return c; }}"
+                     for i in range(functions))
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+def main(argv):
+    functions = int(argv[1]) if len(argv) > 1 else 5000
+    source = generate(functions)
+    lox = Lox()
+    tokens = Scanner(source, lox).scanTokens()
+    slotted_size, statements = measure(lambda: Parser(list(tokens), lox).parse())
+    nodes = count(statements) + len(tokens)
+    # parse() allocates the nodes; the tokens already exist, so measure them separately
+    token_size, _ = measure(lambda: [Token(t.type, t.lexeme, t.literal, t.line) for t in tokens])
+    plain_size, _ = measure(lambda: (unslotted(statements, False), [unslotted(t) for t in tokens]))
+    slotted_size += token_size
+    print(f"{nodes} nodes and tokens")
+    print(f"__dict__  {plain_size / 1e6:7.1f} MB  {plain_size / nodes:6.1f} bytes/node")
+    print(f"__slots__ {slotted_size / 1e6:7.1f} MB  {slotted_size / nodes:6.1f} bytes/node  ({plain_size / slotted_size:.2f}x smaller)")
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,49 @@
+# Lines per second written by `put`: print() per line (how put used to
+# write), the block-buffered Output sink, the line-buffered sink (REPL) and
+# an in-memory sink, with stdout going to a pipe-like file.
+# Usage: python bench/bench_output.py [lines]
+import io, os, sys, time
+from contextlib import redirect_stdout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+from Lox import Lox
+from Output import Output
+
+SOURCE = """
+for (var i = 0; i < {n}; i = i + 1) put i;
+"""
+
+class PrintOutput:
+    def write(self, line):
+        print(line)
+
+    def flush(self):
+        pass
+
+SINKS = {
+    "print": PrintOutput,
+    "block": Output,
+    "line": lambda: Output(bufferSize=0),
+    "memory": lambda: Output(io.StringIO()),
+}
+
+def run(source, engine, sink):
+    lox = Lox()
+    lox.engine = engine
+    lox.interpreter.output = sink()
+    statements = lox.parse(source)
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        lox.execute(statements)
+        return time.perf_counter() - start
+
+def main(argv):
+    n = int(argv[1]) if len(argv) > 1 else 100000
+    source = SOURCE.replace("{n}", str(n))
+    print(f"{n} lines, lines/sec")
+    print(f"{'engine':8} " + " ".join(f"{name:>10}" for name in SINKS))
+    for engine in ("tree", "vm", "closure", "python"):
+        rates = [n / min(run(source, engine, sink) for _ in range(3)) for sink in SINKS.values()]
+        print(f"{engine:8} " + " ".join(f"{rate:10.0f}" for rate in rates))
+
+if __name__ == "__main__":
+    main(sys.argv)
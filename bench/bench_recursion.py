@@ -0,0 +1,37 @@
+# Call throughput of the tree-walking interpreter on recursive functions.
+# Usage: python bench/bench_recursion.py [repeat]
+import io, os, sys, time
+from contextlib import redirect_stdout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+from Lox import Lox
+
+# name, source, number of Lox function calls it makes
+PROGRAMS = (
+    ("fib(22)", """
+fun fib(n) { if (n <= 1) return n; return fib(n - 2) + fib(n - 1); }
+put fib(22);
+""", 57313),
+    ("deep", """
+fun down(n) { if (n <= 0) return 0; return down(n - 1); }
+var i = 0;
+while (i < 100) { down(500); i = i + 1; }
+""", 100 * 501),
+)
+
+def run(source):
+    lox = Lox()
+    statements = lox.parse(source)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        lox.execute(statements)
+    return time.perf_counter() - start
+
+def main(argv):
+    repeat = int(argv[1]) if len(argv) > 1 else 3
+    sys.setrecursionlimit(100000)
+    for name, source, calls in PROGRAMS:
+        seconds = min(run(source) for _ in range(repeat))
+        print(f"{name:8} {calls:>6} calls  {seconds:.3f}s  {calls / seconds:,.0f} calls/s")
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,30 @@
+# Compare variable access with and without the Resolver pass.
+# Usage: python bench/bench_resolver.py [repeat]
+import io, os, sys, time
+from contextlib import redirect_stdout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+from Lox import Lox, Scanner, Parser, Interpreter, Resolver
+
+def run(source, resolve):
+    lox = Lox()
+    statements = Parser(Scanner(source, lox).scanTokens(), lox).parse()
+    interpreter = Interpreter()
+    if resolve:
+        Resolver(interpreter).resolve(statements)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        interpreter.interpret(statements, lox)
+    return time.perf_counter() - start
+
+def main(argv):
+    repeat = int(argv[1]) if len(argv) > 1 else 3
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in ("fib.lox", "nested.lox"):
+        with open(os.path.join(here, name)) as file:
+            source = file.read()
+        dynamic = min(run(source, False) for _ in range(repeat))
+        resolved = min(run(source, True) for _ in range(repeat))
+        print(f"{name:12} dict walk {dynamic:.3f}s  slots {resolved:.3f}s  speedup {dynamic / resolved:.2f}x")
+
+if __name__ == "__main__":
+    main(sys.argv)
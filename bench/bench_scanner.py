@@ -0,0 +1,34 @@
+# Scanner microbenchmark: character-at-a-time Scanner vs the master-regex RegexScanner.
+# Usage: python bench/bench_scanner.py [megabytes]
+import os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+from Lox import Lox, Scanner, RegexScanner
+
+def generate(size):
+    chunk = """// generated workload
+fun compute_value(alpha, beta) {
+    var total = 0;   /* block
+    comment */
+    while (total < 1000.25) { total = total + alpha * beta - 3.5 / 2; }
+    if (total >= 10 and beta != nil or !alpha) put "string literal with spaces";
+    return total;
+}
+"""
+    return chunk * (size // len(chunk) + 1)
+
+def time_scanner(scanner, source):
+    start = time.perf_counter()
+    tokens = scanner(source, Lox()).scanTokens()
+    return time.perf_counter() - start, tokens
+
+def main(argv):
+    megabytes = float(argv[1]) if len(argv) > 1 else 2
+    source = generate(int(megabytes * 1024 * 1024))
+    char, expected = time_scanner(Scanner, source)
+    regex, tokens = time_scanner(RegexScanner, source)
+    same = [(t.type, t.lexeme, t.literal, t.line) for t in expected] == [(t.type, t.lexeme, t.literal, t.line) for t in tokens]
+    print(f"{len(source) / 1e6:.1f} MB, {len(tokens)} tokens, identical streams: {same}")
+    print(f"char {char:.3f}s ({len(source) / char / 1e6:.2f} MB/s)  regex {regex:.3f}s ({len(source) / regex / 1e6:.2f} MB/s)  speedup {char / regex:.2f}x")
+
+if __name__ == "__main__":
+    main(sys.argv)
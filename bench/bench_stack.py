@@ -0,0 +1,46 @@
+# Compare the recursive tree-walking Interpreter with the explicit-stack one,
+# on ordinary (shallow) programs and on programs too deep for Python's stack.
+# Usage: python bench/bench_stack.py [repeat]
+import io, os, sys, time
+from contextlib import redirect_stdout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+from Lox import Lox
+
+DEEP = (
+    ("sum of 10k terms", "put " + " + ".join(["1"] * 10000) + ";"),
+    ("10k-deep calls", "fun sum(n) { if (n == 0) return 0; return n + sum(n - 1); }\nput sum(10000);"),
+    ("100k-deep calls", "fun sum(n) { if (n == 0) return 0; return n + sum(n - 1); }\nput sum(100000);"),
+)
+
+def run(source, engine):
+    lox = Lox(engine)
+    statements = lox.parse(source)
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(io.StringIO()):
+            lox.execute(statements)
+    except RecursionError:
+        return None
+    return time.perf_counter() - start
+
+def report(name, source, repeat):
+    tree = run(source, "tree")
+    if tree is not None:
+        tree = min([tree] + [run(source, "tree") for _ in range(repeat - 1)])
+    stack = min(run(source, "stack") for _ in range(repeat))
+    if tree is None:
+        print(f"{name:18} tree RecursionError  stack {stack:.3f}s")
+    else:
+        print(f"{name:18} tree {tree:.3f}s  stack {stack:.3f}s ({tree / stack:.2f}x)")
+
+def main(argv):
+    repeat = int(argv[1]) if len(argv) > 1 else 3
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in ("fib.lox", "arith.lox", "nested.lox"):
+        with open(os.path.join(here, name)) as file:
+            report(name, file.read(), repeat)
+    for name, source in DEEP:
+        report(name, source, repeat)
+
+if __name__ == "__main__":
+    main(sys.argv)
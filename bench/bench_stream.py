@@ -0,0 +1,49 @@
+# Peak memory and time to first output: whole-file run vs --stream.
+# Usage: python bench/bench_stream.py [statements]
+import io, os, sys, time, tracemalloc
+from contextlib import redirect_stdout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lox"))
+from Lox import Lox
+
+class FirstOutput(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.start = time.perf_counter()
+        self.first = None
+
+    def write(self, text):
+        if self.first is None: self.first = time.perf_counter() - self.start
+        return super().write(text)
+
+def generate(statements):
+    lines = ["var x0 = 0;", "put x0;"]
+    lines += [f"var x{i} = x{i - 1} + {i};" for i in range(1, statements)]
+    lines.append(f"put x{statements - 1};")
+    return "\n".join(lines)
+
+def measure(source, streaming):
+    lox = Lox()
+    lox.scanner = "regex"
+    # line-buffered, as on a terminal: block-buffered output would only
+    # show up once 64K characters piled up or the script ended
+    lox.interpreter.output.bufferSize = 0
+    output = FirstOutput()
+    tracemalloc.start()
+    with redirect_stdout(output):
+        if streaming:
+            lox.run_stream(io.StringIO(source))
+        else:
+            lox.run(source)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, output.first, time.perf_counter() - output.start
+
+def main(argv):
+    statements = int(argv[1]) if len(argv) > 1 else 50000
+    source = generate(statements)
+    for name, streaming in (("whole file", False), ("stream", True)):
+        peak, first, total = measure(source, streaming)
+        print(f"{name:10} peak {peak / 1e6:7.1f} MB  first output {first:.3f}s  total {total:.3f}s")
+
+if __name__ == "__main__":
+    main(sys.argv)
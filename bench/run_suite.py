@@ -0,0 +1,178 @@
+# Benchmark suite: times the Scanner, Parser and Interpreter phases of each
+# workload separately, and compares the results with a stored baseline.
+# Usage: python bench/run_suite.py [--repeat=N] [--output=file] [--save]
+#                                  [--baseline=file] [--threshold=fraction] [workload ...]
+# Exits with status 1 when a phase got slower than the baseline by more
+# than the threshold (default 10%) plus the spread of its runs. The baseline
+# belongs to the machine it was recorded on and is not checked in: the
+# first run records it.
+import io, json, os, platform, subprocess, sys, time
+from contextlib import redirect_stdout
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "lox"))
+from Lox import Lox, Scanner, Parser, Resolver
+
+BASELINE = os.path.join(HERE, "baseline.json")
+THRESHOLD = 0.10
+REPEAT = 5 # runs per workload, the fastest one counts
+PHASES = ("scan", "parse", "interpret")
+# Phases faster than this (seconds) are too noisy to flag as regressions:
+# a few milliseconds of scheduling or cache noise is more than 10% of them
+MIN_SECONDS = 0.05
+
+def deepBlocks(depth=60):
+    # a hot loop at the bottom of `depth` nested blocks, reading a variable
+    # declared at every level
+    lines = [("  " * level) + "{ var v" + str(level) + " = " + str(level) + ";" for level in range(depth)]
+    inner = "  " * depth
+    lines.append(inner + "var total = 0;")
+    lines.append(inner + "for (var i = 0; i < 20000; i = i + 1) total = total + v0 + v" + str(depth - 1) + ";")
+    lines.append(inner + "put total;")
+    lines.extend(("  " * level) + "}" for level in reversed(range(depth)))
+    return "\n".join(lines) + "\n"
+
+def largeSource(count=4000):
+    # lots of code that runs once: scanning and parsing dominate
+    lines = ["var v0 = 0;"]
+    for i in range(1, count):
+        lines.append(f"fun f{i}(a, b) {{ if (a > b) return a - b; return b * 2 + {i}; }}")
+        lines.append(f"var v{i} = f{i}(v{i - 1}, {i}) / 2; // generated")
+    lines.append(f"put v{count - 1};")
+    return "\n".join(lines) + "\n"
+
+def readFile(name):
+    with open(os.path.join(HERE, name)) as file:
+        return file.read()
+
+WORKLOADS = {
+    "fib": lambda: readFile("fib.lox"),
+    "arith": lambda: readFile("arith.lox"),
+    "strings": lambda: readFile("strings.lox"),
+    "nested": lambda: readFile("nested.lox"),
+    "blocks": deepBlocks,
+    "calls": lambda: readFile("calls.lox"),
+    "large": largeSource,
+}
+
+def measure(source):
+    lox = Lox()
+    start = time.perf_counter()
+    tokens = Scanner(source, lox).scanTokens()
+    scanned = time.perf_counter()
+    statements = Parser(tokens, lox).parse()
+    parsed = time.perf_counter()
+    interpreter = lox.interpreter
+    with redirect_stdout(io.StringIO()):
+        Resolver(interpreter).resolve(statements)
+        interpreter.interpret(statements, lox)
+    done = time.perf_counter()
+    if lox.hadError or lox.hadRuntimeError:
+        raise RuntimeError("workload failed to run")
+    return {"scan": scanned - start, "parse": parsed - scanned, "interpret": done - parsed, "tokens": len(tokens)}
+
+def runWorkload(source, repeat):
+    # the fastest of `repeat` runs, phase by phase, and how much slower the
+    # slowest one was: the noise the comparison has to allow for
+    runs = [measure(source) for _ in range(repeat)]
+    result = {phase: min(run[phase] for run in runs) for phase in PHASES}
+    result["spread"] = {phase: max(run[phase] for run in runs) / result[phase] - 1 if result[phase] else 0.0 for phase in PHASES}
+    result["tokens"] = runs[0]["tokens"]
+    return result
+
+def runElsewhere(name, repeat, previous):
+    # runWorkload in a fresh process, kept if it improves on `previous`: a
+    # whole process can run slower than another one for a while, on a
+    # shared machine
+    command = [sys.executable, os.path.abspath(__file__), "--worker=" + name, "--repeat=" + str(repeat)]
+    result = json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout)
+    for phase in PHASES:
+        result[phase] = min(result[phase], previous[phase])
+        result["spread"][phase] = max(result["spread"][phase], previous["spread"][phase])
+    return result
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, phases in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:8} (not in baseline)")
+            continue
+        report = []
+        for phase in PHASES:
+            ratio = phases[phase] / old[phase] if old[phase] else 1.0
+            # baselines saved before the spread was recorded have none
+            noise = max(phases["spread"][phase], old.get("spread", {}).get(phase, 0.0))
+            flag = ""
+            if ratio > 1 + threshold + noise and old[phase] >= MIN_SECONDS:
+                flag = " REGRESSION"
+                regressions.append((name, phase, ratio))
+            report.append(f"{phase} {ratio:5.2f}x{flag}")
+        print(f"{name:8} " + "  ".join(report))
+    return regressions
+
+def parseOptions(argv):
+    options = {"repeat": REPEAT, "output": None, "save": False, "baseline": BASELINE, "threshold": THRESHOLD, "workloads": [], "worker": None}
+    for arg in argv:
+        if arg.startswith("--repeat="):
+            options["repeat"] = int(arg[len("--repeat="):])
+        elif arg.startswith("--output="):
+            options["output"] = arg[len("--output="):]
+        elif arg == "--save":
+            options["save"] = True
+        elif arg.startswith("--baseline="):
+            options["baseline"] = arg[len("--baseline="):]
+        elif arg.startswith("--threshold="):
+            options["threshold"] = float(arg[len("--threshold="):])
+        elif arg.startswith("--worker=") and arg[len("--worker="):] in WORKLOADS:
+            options["worker"] = arg[len("--worker="):] # used by runElsewhere
+        elif arg in WORKLOADS:
+            options["workloads"].append(arg)
+        else:
+            return None
+    return options
+
+def main(argv):
+    options = parseOptions(argv[1:])
+    if options is None:
+        print("Usage: python bench/run_suite.py [--repeat=N] [--output=file] [--save] [--baseline=file] [--threshold=fraction] [" + "|".join(WORKLOADS) + " ...]")
+        sys.exit(64)
+    sys.setrecursionlimit(10000)
+    if options["worker"] is not None:
+        print(json.dumps(runWorkload(WORKLOADS[options["worker"]](), options["repeat"])))
+        return
+
+    results = {}
+    for name in options["workloads"] or WORKLOADS:
+        results[name] = runWorkload(WORKLOADS[name](), options["repeat"])
+        phases = results[name]
+        print(f"{name:8} {phases['tokens']:>7} tokens  scan {phases['scan']:.4f}s  parse {phases['parse']:.4f}s  interpret {phases['interpret']:.4f}s")
+
+    document = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+    if options["output"] is not None:
+        with open(options["output"], "w") as file:
+            json.dump(document, file, indent=2)
+    if options["save"] or not os.path.exists(options["baseline"]):
+        # the first run on a machine records its baseline
+        with open(options["baseline"], "w") as file:
+            json.dump(document, file, indent=2)
+        print("Baseline written to " + options["baseline"])
+        return
+
+    with open(options["baseline"]) as file:
+        baseline = json.load(file)
+    if (baseline["python"], baseline["machine"]) != (document["python"], document["machine"]):
+        print(f"Note: the baseline was recorded with Python {baseline['python']} on {baseline['machine']}")
+    print(f"Compared with {options['baseline']} (threshold {options['threshold']:.0%}):")
+    regressions = compare(results, baseline["results"], options["threshold"])
+    if regressions:
+        # a slowdown has to show up again, in another process, before it counts
+        again = sorted({name for name, _, _ in regressions})
+        print("Measuring " + ", ".join(again) + " again:")
+        for name in again:
+            results[name] = runElsewhere(name, options["repeat"], results[name])
+        regressions = compare({name: results[name] for name in again}, baseline["results"], options["threshold"])
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv)
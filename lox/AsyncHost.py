@@ -0,0 +1,33 @@
+import asyncio
+from StackInterpreter import StackInterpreter
+from Environment import LOX_RuntimeError
+from Embed import isolated, resultOf
+
+# Work items a script runs before it lets the other scripts have a turn
+HOST_STEPS = 1000
+
+
+## Asyncio host
+# Runs many scripts concurrently on one event loop. A script runs on the
+# explicit-stack engine (--engine=stack), whose whole state lives in its
+# work and value stacks, so it can be suspended between any two steps:
+# after every `steps` work items (a statement, a loop test, an operator,
+# ...) it awaits asyncio.sleep(0) and the loop runs the other tasks, and a
+# long `while` loop cannot starve them. The tree engine would have to give
+# every script a thread of its own to stop it halfway through a loop.
+# Each task writes to its own in-memory output, and gets back the same
+# Result as Embed.run().
+async def run(source, inputs=None, steps=HOST_STEPS):
+    lox = isolated("stack", inputs)
+    statements = lox.parse(source)
+    if statements is not None:
+        try:
+            for _ in StackInterpreter(lox.interpreter).slices(statements, steps):
+                await asyncio.sleep(0)
+        except LOX_RuntimeError as error:
+            lox.errorRuntime(error)
+        except SystemExit:
+            pass
+        finally:
+            lox.interpreter.output.flush()
+    return resultOf(lox)
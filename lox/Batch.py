@@ -0,0 +1,96 @@
+import os, sys, io, glob, json, time, traceback, multiprocessing
+from contextlib import redirect_stdout
+from Lox import Lox
+from Stats import Stats
+
+def expand(patterns):
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            paths.extend(sorted(glob.glob(pattern)))
+        else:
+            paths.append(pattern)
+    return paths
+
+def runScript(task):
+    # One script in a fresh Lox (fresh globals), as `python Lox.py` would run it
+    path, options = task
+    lox = Lox()
+    lox.parseOptions(options)
+    if lox.statsFile is not None: Stats(lox.interpreter)
+    output = io.StringIO()
+    error = None
+    start = time.perf_counter()
+    with redirect_stdout(output):
+        try:
+            lox.run_file(path)
+            status = 0
+        except SystemExit as exit: # 65/70 from run_file, or the quit() native
+            status = exit.code if isinstance(exit.code, int) else 0
+        except Exception:
+            # the interpreter itself failed (a missing file, division by zero, ...)
+            status = 1
+            error = traceback.format_exc()
+    result = {"path": path, "status": status, "output": output.getvalue(), "error": error, "seconds": time.perf_counter() - start}
+    # --stats and --timings go into the result instead of stderr
+    if lox.statsFile is not None: result["stats"] = lox.interpreter.stats.report()
+    if lox.timings is not None: result["timings"] = lox.timings.asDict()
+    return result
+
+
+## Batch runner
+# Runs many independent scripts on a pool of forked worker processes. The
+# interpreter modules are imported once, before the fork, and shared with
+# the workers copy-on-write, so a script costs one task on a warm worker
+# instead of a whole `python Lox.py` start-up. Results keep the order of
+# the paths.
+def runBatch(paths, options=(), workers=None):
+    tasks = [(path, list(options)) for path in paths]
+    context = multiprocessing.get_context("fork")
+    with context.Pool(workers or os.cpu_count()) as pool:
+        return pool.map(runScript, tasks, chunksize=1)
+
+def main(argv):
+    workers = None
+    valid = True
+    output = None
+    options = []
+    patterns = []
+    for arg in argv[1:]:
+        if arg.startswith("--workers="):
+            count = arg[len("--workers="):]
+            valid = valid and count.isdigit() and int(count) > 0
+            workers = int(count) if count.isdigit() else None
+        elif arg.startswith("--output="):
+            output = arg[len("--output="):]
+        elif arg.startswith("-"):
+            options.append(arg)
+        else:
+            patterns.append(arg)
+
+    # the remaining options are handed to every script's Lox; one profile
+    # file cannot hold the samples of several processes
+    lox = Lox()
+    if not patterns or lox.parseOptions(options) is None or not valid or lox.profile is not None:
+        print("Usage: python Batch.py [--workers=N] [--output=file] [--engine=...] [--scanner=...] [--no-cache] [--stream] [-O] [--memo[=size]] [--stats] [--timings] script|glob ...")
+        sys.exit(64)
+
+    start = time.perf_counter()
+    results = runBatch(expand(patterns), options, workers)
+    report = {
+        "workers": workers or os.cpu_count(),
+        "seconds": time.perf_counter() - start,
+        "failed": sum(1 for result in results if result["status"] != 0),
+        "scripts": results,
+    }
+    if output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(output, "w") as file:
+            json.dump(report, file, indent=2)
+    sys.exit(1 if report["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,113 @@
+import os, sys, hashlib, pickle, threading
+from collections import OrderedDict
+
+# Bump when the pickled AST layout changes in a way the fingerprint below misses
+CACHE_VERSION = 1
+CACHE_DIR = "__loxcache__"
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+MEMORY_CACHE_ENTRIES = 256
+
+# Modules whose code decides what the parsed program looks like
+SOURCES = ("Token.py", "Expr.py", "Stmt.py", "Lox.py", "RegexScanner.py")
+
+def fingerprint():
+    digest = hashlib.sha256(f"{CACHE_VERSION} {sys.version}".encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in SOURCES:
+        with open(os.path.join(here, name), "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+## On-disk cache of parsed programs (similar to __pycache__)
+# Entries are keyed by a hash of the source text and of the interpreter
+# itself, so editing either one simply misses. The directory is kept under
+# maxBytes by dropping the least recently used entries.
+class ProgramCache:
+
+    def __init__(self, directory, maxBytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.version = fingerprint()
+
+    def path(self, source):
+        digest = hashlib.sha256(self.version.encode())
+        digest.update(source.encode("utf-8"))
+        return os.path.join(self.directory, digest.hexdigest()[:32] + ".ast")
+
+    def load(self, source):
+        path = self.path(source)
+        try:
+            with open(path, "rb") as file:
+                statements = pickle.load(file)
+            os.utime(path) # mark as recently used
+            return statements
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # unreadable or stale entry, parse again and overwrite it
+            return None
+
+    def store(self, source, statements):
+        path = self.path(source)
+        try:
+            data = pickle.dumps(statements, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, RecursionError):
+            return
+        if len(data) > self.maxBytes: return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp = path + ".tmp" + str(os.getpid())
+            with open(temp, "wb") as file:
+                file.write(data)
+            os.replace(temp, path) # readers never see a half-written entry
+            self.evict()
+        except OSError:
+            pass
+
+    def evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".ast"): continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.maxBytes: break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        if not os.path.isdir(self.directory): return
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".ast"):
+                os.remove(entry.path)
+
+
+## In-memory cache of parsed programs (Embed.py)
+# Same interface as ProgramCache, for a process that runs the same sources
+# over and over. The parsed statements are shared by the runs: engines keep
+# their per-run state in the Interpreter, and the inline caches on Variable
+# nodes are keyed by the version of one interpreter's globals.
+class MemoryCache:
+
+    def __init__(self, maxEntries=MEMORY_CACHE_ENTRIES):
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict() # source -> statements, oldest first
+        self.lock = threading.Lock()
+
+    def load(self, source):
+        with self.lock:
+            statements = self.entries.get(source)
+            if statements is not None: self.entries.move_to_end(source)
+            return statements
+
+    def store(self, source, statements):
+        with self.lock:
+            self.entries[source] = statements
+            if len(self.entries) > self.maxEntries: self.entries.popitem(last=False)
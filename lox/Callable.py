@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
-from Environment import Environment
-from Return import ReturnException
+from collections import OrderedDict
+from Environment import Environment, Frame, LOX_RuntimeError
 
 class LoxCallable(ABC):
+    pure = False # natives whose result depends only on their arguments (see Purity.py)
+
     @abstractmethod
     def call(interpreter, arguments):
         pass
@@ -12,22 +14,75 @@ class LoxCallable(ABC):
         pass
 
 class LoxFunction(LoxCallable):
-    def __init__(self, declaration):
+    def __init__(self, declaration, frameSize=None):
         self.declaration = declaration
+        self.body = declaration.body
+        self.params = tuple(param.lexeme for param in declaration.params)
+        self.paramCount = len(self.params)
+        self.frameSize = frameSize # set when the Resolver has assigned slots to the body
+        # slots after the parameters, appended to the arguments on every call
+        self.padding = None if frameSize is None else [None] * (frameSize - self.paramCount)
+        self.memo = None
+    
+    def memoize(self, maxSize):
+        # calls now go through the cache first (the instance attribute wins
+        # over the method, so unmemoized functions pay nothing for it)
+        self.memo = MemoCache(maxSize)
+        self.call = self.callMemoized
+    
+    def callMemoized(self, interpreter, arguments):
+        # the types are part of the key: true == 1 in Python, not in Lox
+        key = tuple(arguments) + tuple(map(type, arguments))
+        memo = self.memo
+        entries = memo.entries
+        if key in entries:
+            memo.hits += 1
+            entries.move_to_end(key)
+            return entries[key]
+        memo.misses += 1
+        value = LoxFunction.call(self, interpreter, arguments)
+        entries[key] = value
+        if len(entries) > memo.maxSize:
+            entries.popitem(last=False)
+        return value
+    
+    def memoStats(self):
+        if self.memo is None: return None
+        return self.memo.stats()
     
     def call(self, interpreter, arguments):
-        environment = Environment(interpreter.globals)
-        for i in range(len(self.declaration.params)):
-            environment.define(self.declaration.params[i].lexeme, arguments[i])
+        function = self
         try:
-            interpreter.executeBlock(self.declaration.body, environment)
-        except ReturnException as Return:
-            return Return.value
-        
-        return None
+            while True:
+                if function.padding is None:
+                    environment = Environment(interpreter.globals)
+                    environment.values = dict(zip(function.params, arguments))
+                else:
+                    # parameters occupy the first slots of the frame
+                    environment = Frame(arguments + function.padding, interpreter.globals)
+                completion = interpreter.executeBlock(function.body, environment)
+                if completion is None: return None
+                if len(completion) == 1: return completion[0]
+                # a tail call (Interpreter.tailCall): loop instead of recursing
+                function, arguments = completion
+        except RecursionError:
+            # Python's stack ran out in the innermost call; the error goes
+            # back up through the others as a Lox one
+            raise LOX_RuntimeError(function.declaration.name, "Stack overflow.")
 
     def arity(self):
-        return len(self.declaration.params)
+        return self.paramCount
     
     def __str__(self):
-        return "<fn " + self.declaration.name.lexeme + ">"
\ No newline at end of file
+        return "<fn " + self.declaration.name.lexeme + ">"
+
+## Least recently used results of a pure LoxFunction
+class MemoCache:
+    def __init__(self, maxSize):
+        self.maxSize = maxSize
+        self.entries = OrderedDict() # argument key -> result, oldest first
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "maxSize": self.maxSize}
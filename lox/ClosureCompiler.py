@@ -0,0 +1,343 @@
+from Expr import ExprVisitor, Call, Grouping, Variable
+from Stmt import StmtVisitor
+from Token import TokenType
+from Callable import LoxCallable
+from Environment import LOX_RuntimeError
+from Rope import isString, concat, flattenAll
+
+
+## Function object produced by the closure compiler
+class ClosureFunction:
+    def __init__(self, token, arity, frameSize, body):
+        self.token = token # the name in the declaration, for errors
+        self.name = token.lexeme
+        self.arity = arity
+        self.frameSize = frameSize
+        self.body = body
+
+    def __str__(self):
+        return "<fn " + self.name + ">"
+
+
+def callValue(interpreter, paren, function, values):
+    # every call but that of a closure function taking this many arguments
+    argCount = len(values)
+    if function.__class__ is ClosureFunction:
+        raise LOX_RuntimeError(paren, "Expected " + str(function.arity) + " arguments but got " + str(argCount) + ".")
+    if not isinstance(function, LoxCallable):
+        raise LOX_RuntimeError(paren, "Can only call functions and classes. ")
+    if argCount != function.arity():
+        raise LOX_RuntimeError(paren, "Expected " + str(function.arity()) + " arguments but got " + str(argCount) + ".")
+    return function.call(interpreter, flattenAll(values))
+
+
+## Closure compiler (Expr/Stmt trees -> nested Python closures)
+# The tree is walked once; every node becomes a closure taking the current
+# frame (a flat list of locals, laid out like the bytecode Compiler does it).
+# Expression closures return their value. Statement closures return None,
+# or a 1-tuple holding the value of an executed `return`, or, for a
+# `return f(...)` inside f, a 2-tuple (function, frame) that the calling
+# closure runs in a loop instead of recursing, as the tree engine does.
+class ClosureCompiler(ExprVisitor, StmtVisitor):
+
+    def __init__(self, interpreter, function=None):
+        self.interpreter = interpreter
+        self.globals = interpreter.globals.own()
+        self.function = function # the Function statement being compiled, if any
+        self.scopes = [{}] if function is not None else []
+        self.slotCount = 0
+
+    def compile(self, statements):
+        body = self.compileBlock(statements)
+        frameSize = self.slotCount
+        def script():
+            return body([None] * frameSize)
+        return script
+
+    def compileBlock(self, statements):
+        compiled = tuple(statement.accept(self) for statement in statements)
+        if len(compiled) == 1:
+            return compiled[0]
+        def block(frame):
+            for statement in compiled:
+                completion = statement(frame)
+                if completion is not None: return completion
+            return None
+        return block
+
+    # Scopes
+    def declare(self, name):
+        slot = self.slotCount
+        self.slotCount += 1
+        self.scopes[-1][name.lexeme] = slot
+        return slot
+
+    def resolveLocal(self, name):
+        for scope in reversed(self.scopes):
+            slot = scope.get(name.lexeme)
+            if slot is not None: return slot
+        return None
+
+    def defineVariable(self, name, value):
+        if self.scopes:
+            slot = self.declare(name)
+            def define(frame):
+                frame[slot] = value(frame)
+            return define
+        globals = self.globals
+        lexeme = name.lexeme
+        def defineGlobal(frame):
+            globals[lexeme] = value(frame)
+        return defineGlobal
+
+    # Visitor patterns (statements)
+    def visit_block_stmt(self, stmt):
+        self.scopes.append({})
+        block = self.compileBlock(stmt.statements)
+        self.scopes.pop()
+        return block
+
+    def visit_expression_stmt(self, stmt):
+        expression = stmt.expression.accept(self)
+        def statement(frame):
+            expression(frame)
+        return statement
+
+    def visit_function_stmt(self, stmt):
+        compiler = ClosureCompiler(self.interpreter, stmt)
+        for param in stmt.params:
+            compiler.declare(param)
+        body = compiler.compileBlock(stmt.body)
+        function = ClosureFunction(stmt.name, len(stmt.params), compiler.slotCount, body)
+        return self.defineVariable(stmt.name, lambda frame: function)
+
+    def visit_if_stmt(self, stmt):
+        condition = stmt.condition.accept(self)
+        thenBranch = stmt.thenBranch.accept(self)
+        if stmt.elseBranch is None:
+            def ifThen(frame):
+                value = condition(frame)
+                if value is not None and value is not False:
+                    return thenBranch(frame)
+                return None
+            return ifThen
+        elseBranch = stmt.elseBranch.accept(self)
+        def ifThenElse(frame):
+            value = condition(frame)
+            if value is not None and value is not False:
+                return thenBranch(frame)
+            return elseBranch(frame)
+        return ifThenElse
+
+    def visit_put_stmt(self, stmt):
+        stringify = self.interpreter.stringify
+        write = self.interpreter.output.write
+        expression = stmt.expression.accept(self)
+        def put(frame):
+            write(stringify(expression(frame)))
+        return put
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is None:
+            return lambda frame: (None,)
+        call = self.selfCall(stmt.value)
+        if call is not None:
+            return self.tailCall(call)
+        value = stmt.value.accept(self)
+        def ret(frame):
+            return (value(frame),)
+        return ret
+
+    def selfCall(self, expr):
+        # `return f(...)` inside f, f being a global (see Resolver.selfCall)
+        while isinstance(expr, Grouping):
+            expr = expr.expression
+        if self.function is None or not isinstance(expr, Call): return None
+        callee = expr.callee
+        if not isinstance(callee, Variable) or callee.name.lexeme != self.function.name.lexeme: return None
+        if self.resolveLocal(callee.name) is not None: return None
+        return expr
+
+    def tailCall(self, expr):
+        # The name is looked up again on every call: when it still holds a
+        # closure function taking these arguments, hand it back with its
+        # frame; anything else is called here
+        interpreter = self.interpreter
+        callee = expr.callee.accept(self)
+        arguments = tuple(argument.accept(self) for argument in expr.arguments)
+        argCount = len(arguments)
+        paren = expr.paren
+        def tail(frame):
+            function = callee(frame)
+            values = [argument(frame) for argument in arguments]
+            if function.__class__ is ClosureFunction and argCount == function.arity:
+                values.extend([None] * (function.frameSize - argCount))
+                return (function, values)
+            return (callValue(interpreter, paren, function, values),)
+        return tail
+
+    def visit_var_stmt(self, stmt):
+        # The initializer is compiled before the name is declared,
+        # so it still sees the outer binding
+        if stmt.initializer is None:
+            return self.defineVariable(stmt.name, lambda frame: None)
+        return self.defineVariable(stmt.name, stmt.initializer.accept(self))
+
+    def visit_while_stmt(self, stmt):
+        condition = stmt.condition.accept(self)
+        body = stmt.body.accept(self)
+        def loop(frame):
+            while True:
+                value = condition(frame)
+                if value is None or value is False: return None
+                completion = body(frame)
+                if completion is not None: return completion
+        return loop
+
+    # Visitor patterns (expressions)
+    def visit_assign_expr(self, expr):
+        value = expr.value.accept(self)
+        slot = self.resolveLocal(expr.name)
+        if slot is not None:
+            def assignLocal(frame):
+                result = frame[slot] = value(frame)
+                return result
+            return assignLocal
+        globals = self.globals
+        name = expr.name
+        lexeme = name.lexeme
+        def assignGlobal(frame):
+            result = value(frame)
+            if lexeme not in globals:
+                raise LOX_RuntimeError(name, "Undefined variable '" + lexeme + "'.")
+            globals[lexeme] = result
+            return result
+        return assignGlobal
+
+    def visit_binary_expr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        operator = expr.operator
+
+        def numbers(a, b):
+            if isinstance(a, float) and isinstance(b, float): return
+            raise LOX_RuntimeError(operator, "Operands mush be numbers")
+
+        match operator.type:
+            case TokenType.GREATER:
+                def binary(frame):
+                    a = left(frame); b = right(frame); numbers(a, b)
+                    return a > b
+            case TokenType.GREATER_EQUAL:
+                def binary(frame):
+                    a = left(frame); b = right(frame); numbers(a, b)
+                    return a >= b
+            case TokenType.LESS:
+                def binary(frame):
+                    a = left(frame); b = right(frame); numbers(a, b)
+                    return a < b
+            case TokenType.LESS_EQUAL:
+                def binary(frame):
+                    a = left(frame); b = right(frame); numbers(a, b)
+                    return a <= b
+            case TokenType.BANG_EQUAL:
+                def binary(frame):
+                    return not left(frame) == right(frame)
+            case TokenType.EQUAL_EQUAL:
+                def binary(frame):
+                    return left(frame) == right(frame)
+            case TokenType.MINUS:
+                def binary(frame):
+                    a = left(frame); b = right(frame); numbers(a, b)
+                    return a - b
+            case TokenType.PLUS:
+                def binary(frame):
+                    a = left(frame); b = right(frame)
+                    if isinstance(a, float) and isinstance(b, float):
+                        return a + b
+                    if isString(a) and isString(b):
+                        return concat(a, b)
+                    raise LOX_RuntimeError(operator, "Operand must be two numbers or two strings")
+            case TokenType.SLASH:
+                def binary(frame):
+                    a = left(frame); b = right(frame); numbers(a, b)
+                    return a / b
+            case TokenType.STAR:
+                def binary(frame):
+                    a = left(frame); b = right(frame); numbers(a, b)
+                    return a * b
+        return binary
+
+    def visit_call_expr(self, expr):
+        interpreter = self.interpreter
+        callee = expr.callee.accept(self)
+        arguments = tuple(argument.accept(self) for argument in expr.arguments)
+        argCount = len(arguments)
+        paren = expr.paren
+
+        def call(frame):
+            function = callee(frame)
+            values = [argument(frame) for argument in arguments]
+            if function.__class__ is ClosureFunction and argCount == function.arity:
+                values.extend([None] * (function.frameSize - argCount))
+                try:
+                    completion = function.body(values)
+                    # a tail call (tailCall): run it in place of this frame
+                    while completion is not None and len(completion) == 2:
+                        function, values = completion
+                        completion = function.body(values)
+                except RecursionError:
+                    # as in LoxFunction.call
+                    raise LOX_RuntimeError(function.token, "Stack overflow.")
+                return None if completion is None else completion[0]
+            return callValue(interpreter, paren, function, values)
+        return call
+
+    def visit_grouping_expr(self, expr):
+        return expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        value = expr.value
+        return lambda frame: value
+
+    def visit_logical_expr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if expr.operator.type == TokenType.OR:
+            def logical(frame):
+                value = left(frame)
+                if value is not None and value is not False: return value
+                return right(frame)
+        else:
+            def logical(frame):
+                value = left(frame)
+                if value is None or value is False: return value
+                return right(frame)
+        return logical
+
+    def visit_unary_expr(self, expr):
+        right = expr.right.accept(self)
+        operator = expr.operator
+        if operator.type == TokenType.MINUS:
+            def negate(frame):
+                value = right(frame)
+                if not isinstance(value, float):
+                    raise LOX_RuntimeError(operator, "Operand must be a number.")
+                return -value
+            return negate
+        def bang(frame):
+            value = right(frame)
+            return value is None or value is False
+        return bang
+
+    def visit_variable_expr(self, expr):
+        slot = self.resolveLocal(expr.name)
+        if slot is not None:
+            return lambda frame: frame[slot]
+        globals = self.globals
+        name = expr.name
+        lexeme = name.lexeme
+        def getGlobal(frame):
+            if lexeme in globals: return globals[lexeme]
+            raise LOX_RuntimeError(name, "Undefined variable '" + lexeme + "'.")
+        return getGlobal
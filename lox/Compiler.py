@@ -0,0 +1,245 @@
+from Expr import ExprVisitor
+from Stmt import StmtVisitor
+from Token import TokenType
+
+## OPCODE DEFINE
+class OpCode:
+    CONSTANT = 0
+    NIL = 1
+    TRUE = 2
+    FALSE = 3
+    POP = 4
+    GET_LOCAL = 5
+    SET_LOCAL = 6
+    GET_GLOBAL = 7
+    SET_GLOBAL = 8
+    DEFINE_GLOBAL = 9
+    EQUAL = 10
+    NOT_EQUAL = 11
+    GREATER = 12
+    GREATER_EQUAL = 13
+    LESS = 14
+    LESS_EQUAL = 15
+    ADD = 16
+    SUBTRACT = 17
+    MULTIPLY = 18
+    DIVIDE = 19
+    NOT = 20
+    NEGATE = 21
+    PUT = 22
+    JUMP = 23
+    JUMP_IF_FALSE = 24
+    JUMP_IF_TRUE = 25
+    CALL = 26
+    RETURN = 27
+    FUNCTION = 28
+
+# operators that raise a runtime error carry the operator token as an operand
+binaryOps = {
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.STAR: OpCode.MULTIPLY,
+}
+
+
+## Compiled form of a function (or of the top-level script)
+class Chunk:
+    def __init__(self, name):
+        self.name = name
+        self.code = []      # opcodes with their operands inline
+        self.constants = [] # literal values, tokens (for errors) and nested chunks
+        self.arity = 0
+        self.frameSize = 0
+
+    def __str__(self):
+        return "<fn " + self.name + ">"
+
+
+## Compiler (Expr/Stmt trees -> Chunk)
+# Functions only close over the globals, so every local of a function
+# (parameters and block variables alike) lives in one flat frame.
+# Top-level declarations are globals; top-level blocks use the script's frame.
+class Compiler(ExprVisitor, StmtVisitor):
+
+    def __init__(self, name="script", function=False):
+        self.chunk = Chunk(name)
+        self.scopes = [{}] if function else []
+        self.slotCount = 0
+
+    def compile(self, statements):
+        for statement in statements:
+            statement.accept(self)
+        self.emit(OpCode.NIL)
+        self.emit(OpCode.RETURN)
+        return self.chunk
+
+    # Emitting
+    def emit(self, *code):
+        self.chunk.code.extend(code)
+
+    def makeConstant(self, value):
+        self.chunk.constants.append(value)
+        return len(self.chunk.constants) - 1
+
+    def emitJump(self, op):
+        self.emit(op, None)
+        return len(self.chunk.code) - 1
+
+    def patchJump(self, offset):
+        self.chunk.code[offset] = len(self.chunk.code)
+
+    # Scopes
+    def beginScope(self):
+        self.scopes.append({})
+
+    def endScope(self):
+        self.scopes.pop()
+
+    def declare(self, name):
+        slot = self.slotCount
+        self.slotCount += 1
+        self.chunk.frameSize = self.slotCount
+        self.scopes[-1][name.lexeme] = slot
+        return slot
+
+    def defineVariable(self, name):
+        if self.scopes:
+            self.emit(OpCode.SET_LOCAL, self.declare(name), OpCode.POP)
+        else:
+            self.emit(OpCode.DEFINE_GLOBAL, self.makeConstant(name.lexeme))
+
+    def resolveLocal(self, name):
+        for scope in reversed(self.scopes):
+            slot = scope.get(name.lexeme)
+            if slot is not None: return slot
+        return None
+
+    # Visitor patterns (statements)
+    def visit_block_stmt(self, stmt):
+        self.beginScope()
+        for statement in stmt.statements:
+            statement.accept(self)
+        self.endScope()
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression.accept(self)
+        self.emit(OpCode.POP)
+
+    def visit_function_stmt(self, stmt):
+        compiler = Compiler(stmt.name.lexeme, True)
+        for param in stmt.params:
+            compiler.declare(param)
+        chunk = compiler.compile(stmt.body)
+        chunk.arity = len(stmt.params)
+        self.emit(OpCode.FUNCTION, self.makeConstant(chunk))
+        self.defineVariable(stmt.name)
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition.accept(self)
+        thenJump = self.emitJump(OpCode.JUMP_IF_FALSE)
+        self.emit(OpCode.POP)
+        stmt.thenBranch.accept(self)
+        elseJump = self.emitJump(OpCode.JUMP)
+        self.patchJump(thenJump)
+        self.emit(OpCode.POP)
+        if stmt.elseBranch is not None:
+            stmt.elseBranch.accept(self)
+        self.patchJump(elseJump)
+
+    def visit_put_stmt(self, stmt):
+        stmt.expression.accept(self)
+        self.emit(OpCode.PUT)
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is None:
+            self.emit(OpCode.NIL)
+        else:
+            stmt.value.accept(self)
+        self.emit(OpCode.RETURN)
+
+    def visit_var_stmt(self, stmt):
+        # The initializer is compiled before the name is declared,
+        # so it still sees the outer binding
+        if stmt.initializer is None:
+            self.emit(OpCode.NIL)
+        else:
+            stmt.initializer.accept(self)
+        self.defineVariable(stmt.name)
+
+    def visit_while_stmt(self, stmt):
+        loopStart = len(self.chunk.code)
+        stmt.condition.accept(self)
+        exitJump = self.emitJump(OpCode.JUMP_IF_FALSE)
+        self.emit(OpCode.POP)
+        stmt.body.accept(self)
+        self.emit(OpCode.JUMP, loopStart)
+        self.patchJump(exitJump)
+        self.emit(OpCode.POP)
+
+    # Visitor patterns (expressions)
+    def visit_assign_expr(self, expr):
+        expr.value.accept(self)
+        slot = self.resolveLocal(expr.name)
+        if slot is None:
+            self.emit(OpCode.SET_GLOBAL, self.makeConstant(expr.name))
+        else:
+            self.emit(OpCode.SET_LOCAL, slot)
+
+    def visit_binary_expr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+        type = expr.operator.type
+        if type == TokenType.EQUAL_EQUAL:
+            self.emit(OpCode.EQUAL)
+        elif type == TokenType.BANG_EQUAL:
+            self.emit(OpCode.NOT_EQUAL)
+        else:
+            self.emit(binaryOps[type], self.makeConstant(expr.operator))
+
+    def visit_call_expr(self, expr):
+        expr.callee.accept(self)
+        for argument in expr.arguments:
+            argument.accept(self)
+        self.emit(OpCode.CALL, len(expr.arguments), self.makeConstant(expr.paren))
+
+    def visit_grouping_expr(self, expr):
+        expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        if expr.value is None:
+            self.emit(OpCode.NIL)
+        elif expr.value is True:
+            self.emit(OpCode.TRUE)
+        elif expr.value is False:
+            self.emit(OpCode.FALSE)
+        else:
+            self.emit(OpCode.CONSTANT, self.makeConstant(expr.value))
+
+    def visit_logical_expr(self, expr):
+        expr.left.accept(self)
+        if expr.operator.type == TokenType.OR:
+            endJump = self.emitJump(OpCode.JUMP_IF_TRUE)
+        else:
+            endJump = self.emitJump(OpCode.JUMP_IF_FALSE)
+        self.emit(OpCode.POP)
+        expr.right.accept(self)
+        self.patchJump(endJump)
+
+    def visit_unary_expr(self, expr):
+        expr.right.accept(self)
+        if expr.operator.type == TokenType.MINUS:
+            self.emit(OpCode.NEGATE, self.makeConstant(expr.operator))
+        else:
+            self.emit(OpCode.NOT)
+
+    def visit_variable_expr(self, expr):
+        slot = self.resolveLocal(expr.name)
+        if slot is None:
+            self.emit(OpCode.GET_GLOBAL, self.makeConstant(expr.name))
+        else:
+            self.emit(OpCode.GET_LOCAL, slot)
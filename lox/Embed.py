@@ -0,0 +1,61 @@
+import io
+from Lox import Lox, ENGINES
+from Output import Output
+from Rope import Rope
+from Cache import MemoryCache
+from GlobalFunction import BASE_GLOBALS
+
+# Parsed programs shared by every run() in the process (None to parse every time)
+programs = MemoryCache()
+
+def toLox(name, value):
+    # bool before int: True is an int too
+    if value is None or isinstance(value, (bool, str)): return value
+    if isinstance(value, (int, float)): return float(value)
+    raise TypeError("input '" + name + "': a " + type(value).__name__ + " cannot be passed to Lox")
+
+def fromLox(value):
+    if value.__class__ is Rope: return value.flatten()
+    return value
+
+
+## Result of run()
+class Result:
+    def __init__(self, status, output, values):
+        self.status = status # 0, 65 (syntax error) or 70 (runtime error), as `python Lox.py` exits
+        self.output = output # everything the script put, error messages included
+        self.values = values # the globals the inputs and the script defined, as Python values
+
+    def __repr__(self):
+        return f"Result(status={self.status}, output={self.output!r}, values={self.values!r})"
+
+
+## Embedding API
+# run() executes `source` in a fresh Lox of its own and returns a Result; it
+# never exits the process (quit() only ends the script). The `inputs` become
+# globals before the script starts: numbers, strings, booleans and None.
+# Fresh instances are cheap: their globals start out as the shared,
+# read-only BASE_GLOBALS, and a source already seen is not parsed again.
+def run(source, inputs=None, engine="tree"):
+    lox = isolated(engine, inputs)
+    try:
+        lox.run(source)
+    except SystemExit:
+        pass
+    return resultOf(lox)
+
+def isolated(engine, inputs):
+    # a fresh Lox that writes to memory, with the inputs defined
+    if engine not in ENGINES: raise ValueError("unknown engine '" + engine + "'")
+    lox = Lox(engine)
+    lox.cache = programs
+    lox.interpreter.output = Output(io.StringIO())
+    if inputs:
+        for name, value in inputs.items():
+            lox.interpreter.globals.define(name, toLox(name, value))
+    return lox
+
+def resultOf(lox):
+    status = 65 if lox.hadError else 70 if lox.hadRuntimeError else 0
+    values = {name: fromLox(value) for name, value in lox.interpreter.globals.values.items() if BASE_GLOBALS.get(name) is not value}
+    return Result(status, lox.interpreter.output.stream.getvalue(), values)
@@ -1,3 +1,5 @@
+import itertools
+
 class LOX_RuntimeError(RuntimeError):
     def __init__(self, token, message):
         super().__init__(message)
@@ -24,4 +26,73 @@ class Environment:
         if name.lexeme in self.values:
             return self.values[name.lexeme]
         if self.enclosing is not None: return self.enclosing.get(name)
-        raise LOX_RuntimeError(name, "Undefined variable '"+ name.lexeme + "'.")
\ No newline at end of file
+        raise LOX_RuntimeError(name, "Undefined variable '"+ name.lexeme + "'.")
+
+# The global scope. Every define() (a top-level `var` or `fun`, or a native)
+# gives it a new version, which invalidates the inline caches on Variable
+# nodes (see Interpreter.lookUpVariable). A name that is ever assigned to is
+# never cached, so assign() only needs a new version the first time.
+# A read-only `base` mapping (the natives, see BASE_GLOBALS) is shared by
+# every interpreter and only copied by the first one to write to its globals.
+versions = itertools.count(1) # shared, so two interpreters never hand out the same one
+
+class GlobalEnvironment(Environment):
+    def __init__(self, base=None):
+        super().__init__()
+        if base is not None: self.values = base
+        self.shared = base is not None
+        self.version = next(versions)
+        self.mutable = set()
+
+    def own(self):
+        # the values as a dict of our own, for the engines that write to it directly
+        if self.shared:
+            self.values = dict(self.values)
+            self.shared = False
+        return self.values
+
+    def define(self, name, value):
+        self.own()[name] = value
+        self.version = next(versions)
+
+    def assign(self, name, value):
+        if name.lexeme not in self.mutable and name.lexeme in self.values:
+            self.mutable.add(name.lexeme)
+            self.version = next(versions)
+        self.own()
+        super().assign(name, value)
+
+# Array-backed scope used once the Resolver has assigned slots to locals.
+# Names are gone at this point, so lookups by name (globals) go straight through.
+class LocalEnvironment:
+    __slots__ = ('values', 'enclosing')
+
+    def __init__(self, size, enclosing):
+        self.values = [None] * size
+        self.enclosing = enclosing
+
+    def ancestor(self, depth):
+        environment = self
+        for _ in range(depth):
+            environment = environment.enclosing
+        return environment
+
+    def getAt(self, depth, slot):
+        return self.ancestor(depth).values[slot]
+
+    def assignAt(self, depth, slot, value):
+        self.ancestor(depth).values[slot] = value
+
+    def assign(self, name, value):
+        self.enclosing.assign(name, value)
+
+    def get(self, name):
+        return self.enclosing.get(name)
+
+# Frame of a function call, built around a list that is already the right size
+class Frame(LocalEnvironment):
+    __slots__ = ()
+
+    def __init__(self, values, enclosing):
+        self.values = values
+        self.enclosing = enclosing
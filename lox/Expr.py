@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 
 class Expr(ABC):
+	__slots__ = ()
 	@abstractmethod
 	def accept(self, visitor):
 		pass
@@ -39,6 +40,7 @@ class ExprVisitor:
 		pass
 
 class Assign(Expr):
+	__slots__ = ('name', 'value')
 	def __init__(self, name, value):
 		self.name = name
 		self.value = value
@@ -46,6 +48,7 @@ class Assign(Expr):
 		return visitor.visit_assign_expr(self)
 
 class Binary(Expr):
+	__slots__ = ('left', 'operator', 'right')
 	def __init__(self, left, operator, right):
 		self.left = left
 		self.operator = operator
@@ -54,6 +57,7 @@ class Binary(Expr):
 		return visitor.visit_binary_expr(self)
 
 class Call(Expr):
+	__slots__ = ('callee', 'paren', 'arguments')
 	def __init__(self, callee, paren, arguments):
 		self.callee = callee
 		self.paren = paren
@@ -62,18 +66,21 @@ class Call(Expr):
 		return visitor.visit_call_expr(self)
 
 class Grouping(Expr):
+	__slots__ = ('expression',)
 	def __init__(self, expression):
 		self.expression = expression
 	def accept(self, visitor):
 		return visitor.visit_grouping_expr(self)
 
 class Literal(Expr):
+	__slots__ = ('value',)
 	def __init__(self, value):
 		self.value = value
 	def accept(self, visitor):
 		return visitor.visit_literal_expr(self)
 
 class Logical(Expr):
+	__slots__ = ('left', 'operator', 'right')
 	def __init__(self, left, operator, right):
 		self.left = left
 		self.operator = operator
@@ -82,6 +89,7 @@ class Logical(Expr):
 		return visitor.visit_logical_expr(self)
 
 class Unary(Expr):
+	__slots__ = ('operator', 'right')
 	def __init__(self, operator, right):
 		self.operator = operator
 		self.right = right
@@ -89,8 +97,10 @@ class Unary(Expr):
 		return visitor.visit_unary_expr(self)
 
 class Variable(Expr):
+	__slots__ = ('name', 'cache')
 	def __init__(self, name):
 		self.name = name
+		self.cache = None
 	def accept(self, visitor):
 		return visitor.visit_variable_expr(self)
 
@@ -1,8 +1,10 @@
 from Callable import LoxCallable, LoxFunction
 import os, time
+from types import MappingProxyType
             
 class ClearCallable(LoxCallable):
     def call(self, interpreter, arguments):
+        interpreter.output.flush()
         os.system('clear')
         return 0
             
@@ -43,4 +45,12 @@ class StrCallable(LoxCallable):
     def __str__(self):
         return "<native fn>"
 
-        
\ No newline at end of file
+
+# The natives every interpreter starts with. They keep no state, so one set
+# of them is shared (read-only) by all the GlobalEnvironments.
+BASE_GLOBALS = MappingProxyType({
+    "clock": ClockCallable(),
+    "clear": ClearCallable(),
+    "quit": QuitCallable(),
+    "str": StrCallable(),
+})
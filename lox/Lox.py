@@ -1,97 +1,39 @@
 #!/opt/homebrew/bin/python3
-import os, sys, readline, time
-from Expr import Binary, Grouping, Literal, Unary, Variable, Assign, Call, Logical, ExprVisitor
-from Stmt import Put, Expression, Var, Block, If, While, Function, Return, StmtVisitor
+import os, sys, readline, time, operator
+from contextlib import nullcontext
+from Expr import Expr, Binary, Grouping, Literal, Unary, Variable, Assign, Call, Logical, ExprVisitor
+from Stmt import Stmt, Put, Expression, Var, Block, If, While, Function, Return, StmtVisitor
 from Callable import LoxCallable, LoxFunction
-from Environment import Environment, LOX_RuntimeError
-from Return import ReturnException
+from Environment import Environment, LocalEnvironment, GlobalEnvironment, LOX_RuntimeError
+from Resolver import Resolver
+from Token import TokenType, Token, keywords, tokenNames
+from Compiler import Compiler
+from VM import VM
+from ClosureCompiler import ClosureCompiler
+from Transpiler import runPython
+from StackInterpreter import StackInterpreter
+from Cache import ProgramCache, CACHE_DIR
+from RegexScanner import RegexScanner, StreamScanner
+from Optimizer import Optimizer
+from Purity import PurityAnalyzer
+from Profiler import Profiler
+from Stats import Stats
+from Timings import Timings, countNodes
+from Rope import isString, concat, flattenAll
+from Output import Output
 from GlobalFunction import *
 
-## TOKEN TYPE DEFINE
-class TokenType:
-    # Single-character tokens.
-    LEFT_PAREN = "LEFT_PAREN"
-    RIGHT_PAREN = "RIGHT_PAREN"
-    LEFT_BRACE = "LEFT_BRACE"
-    RIGHT_BRACE = "RIGHT_BRACE"
-    COMMA = "COMMA"
-    DOT = "DOT"
-    MINUS = "MINUS"
-    PLUS = "PLUS"
-    SEMICOLON = "SEMICOLON"
-    SLASH = "SLASH"
-    STAR = "STAR"
-
-    # One or two character tokens.
-    BANG = "BANG"
-    BANG_EQUAL = "BANG_EQUAL"
-    EQUAL = "EQUAL"
-    EQUAL_EQUAL = "EQUAL_EQUAL"
-    GREATER = "GREATER"
-    GREATER_EQUAL = "GREATER_EQUAL"
-    LESS = "LESS"
-    LESS_EQUAL = "LESS_EQUAL"
-
-    # Literals.
-    IDENTIFIER = "IDENTIFIER"
-    STRING = "STRING"
-    NUMBER = "NUMBER"
-
-    # Keywords.
-    AND = "AND"
-    CLASS = "CLASS"
-    ELSE = "ELSE"
-    FALSE = "FALSE"
-    FUN = "FUN"
-    FOR = "FOR"
-    IF = "IF"
-    NIL = "NIL"
-    OR = "OR"
-    PUT = "PUT"
-    RETURN = "RETURN"
-    SUPER = "SUPER"
-    THIS = "THIS"
-    TRUE = "TRUE"
-    VAR = "VAR"
-    WHILE = "WHILE"
-    BREAK = "BREAK"
-    CONTINUE = "CONTINUE"
-
-    EOF = "EOF"
-
-## Reserve keywords
-keywords = {
-    "and": "AND",
-    "class": "CLASS",
-    "else": "ELSE",
-    "false": "FALSE",
-    "for": "FOR",
-    "fun": "FUN",
-    "if": "IF",
-    "nil": "NIL",
-    "or": "OR",
-    "put": "PUT",
-    "return": "RETURN",
-    "super": "SUPER",
-    "this": "THIS",
-    "true": "TRUE",
-    "var": "VAR",
-    "while": "WHILE", 
-    "break": "BREAK",
-    "continue": "CONTINUE"
-}
-
-
-class Token:
-    def __init__(self, type, lexeme, literal, line):
-        self.type = type
-        self.lexeme = lexeme
-        self.literal = literal
-        self.line = line
-    
-    def __str__(self):
-        return f"{self.type} {self.lexeme} {self.literal}"
-    
+DEBUG = False
+
+# Execution engines selectable with --engine=
+ENGINES = ("tree", "vm", "closure", "python", "stack")
+# Scanner implementations selectable with --scanner=
+SCANNERS = ("char", "regex")
+# Results kept per pure function with --memo
+MEMO_SIZE = 1024
+# Collapsed stacks written by --profile
+PROFILE_FILE = "lox-profile.collapsed"
+
 ## The Scanner class
 class Scanner():
     
@@ -135,7 +77,7 @@ class Scanner():
     # Method for handling string
     def string(self):
         while self.peak() != '"' and not self.isAtEnd():
-            if self.peak == '\n': 
+            if self.peak() == '\n': 
                 self.line += 1
             self.advance()
         if self.isAtEnd():
@@ -210,8 +152,8 @@ class Scanner():
                     while(self.peak() != '\n' and not self.isAtEnd()) : 
                         self.advance()
                 elif self.match('*'):
-                    while(self.peak() != '*' and self.peakNext () != '/' and not self.isAtEnd()):
-                        if self.peak == '\n': 
+                    while(not (self.peak() == '*' and self.peakNext() == '/') and not self.isAtEnd()):
+                        if self.peak() == '\n': 
                             self.line += 1
                         self.advance()
                     if self.isAtEnd():
@@ -232,9 +174,6 @@ class Scanner():
                 self.line += 1
             case '"':
                 self.string() 
-            case 'o':
-                if self.match('r'):
-                    self.addToken(TokenType.OR)
             case _:
                 if self.isDigit(c) :
                    self.number() 
@@ -356,11 +295,15 @@ class Parser:
         return expr
                 
     def unary(self):
-        if (self.match(TokenType.BANG, TokenType.MINUS)):
-            operator = self.previous()
-            right = self.unary()
-            return Unary(operator, right)
-        return self.call()
+        # a loop rather than recursion, so a long run of prefix operators
+        # does not run into Python's recursion limit
+        operators = []
+        while self.match(TokenType.BANG, TokenType.MINUS):
+            operators.append(self.previous())
+        expr = self.call()
+        for operator in reversed(operators):
+            expr = Unary(operator, expr)
+        return expr
     
     def factor(self):
         expr = self.unary()
@@ -566,27 +509,159 @@ class Parser:
     def parse(self):
         statements = []
         while not self.isAtEnd():
-            statements.append(self.declaration())
+            statements.append(self.topDeclaration())
         return statements
 
+    def topDeclaration(self):
+        # Parentheses and blocks are parsed recursively, about ten Python
+        # frames per level; nesting past Python's recursion limit is reported
+        # as a syntax error once the stack has unwound
+        try:
+            return self.declaration()
+        except RecursionError:
+            self.lox.errorToken(self.peek(), "Nested too deeply.")
+            self.synchronize()
+            return None
+    
+
+
+## Parser over a token iterator
+# Tokens are pulled from the scanner only when the parser looks at them, and
+# the ones before the previous token are dropped after every declaration.
+class StreamParser(Parser):
+    
+    def __init__(self, tokens, lox):
+        super().__init__([], lox)
+        self.stream = iter(tokens)
+    
+    def peek(self):
+        # the parser peeks at every token several times: only pull a new one
+        # from the scanner once the buffered ones are used up
+        try:
+            return self.tokens[self.current]
+        except IndexError:
+            pass
+        try:
+            self.tokens.append(next(self.stream))
+        except StopIteration:
+            # the scanner was stopped by a RecursionError raised inside it
+            # (see topDeclaration); the rest of the input is lost
+            self.tokens.append(Token(TokenType.EOF, "", None, self.tokens[-1].line))
+        return self.tokens[self.current]
+    
+    def parseStream(self):
+        # one declaration at a time, as soon as its tokens are available
+        while not self.isAtEnd():
+            yield self.topDeclaration()
+            del self.tokens[:self.current - 1]
+            self.current = 1
+
+
+# Binary operators that only take numbers, indexed by TokenType
+numberOperators = [None] * len(tokenNames)
+numberOperators[TokenType.GREATER] = operator.gt
+numberOperators[TokenType.GREATER_EQUAL] = operator.ge
+numberOperators[TokenType.LESS] = operator.lt
+numberOperators[TokenType.LESS_EQUAL] = operator.le
+numberOperators[TokenType.MINUS] = operator.sub
+numberOperators[TokenType.SLASH] = operator.truediv
+numberOperators[TokenType.STAR] = operator.mul
+
+# Every AST node class, for the walks that look at nodes without visiting them
+nodeClasses = frozenset(Expr.__subclasses__() + Stmt.__subclasses__())
+
+def deepestToken(statements):
+    # The token held by the most deeply nested node that has one, where a
+    # pass over the tree most likely ran out of stack; None without tokens
+    token, deepest = None, -1
+    pending = [(statement, 0) for statement in statements]
+    while pending:
+        node, depth = pending.pop()
+        if node.__class__ is list:
+            pending.extend((item, depth) for item in node)
+        elif node.__class__ is Token:
+            if depth > deepest: token, deepest = node, depth
+        elif node.__class__ in nodeClasses:
+            pending.extend((getattr(node, field), depth + 1) for field in node.__slots__)
+    return token
 
 ## Interpreter (Visitor Class)
 class Interpreter(ExprVisitor, StmtVisitor):
     
     def __init__(self):
         super().__init__()
-        self.globals = Environment()
+        self.globals = GlobalEnvironment(BASE_GLOBALS)
         self.environment = self.globals
-        self.GlobalFunction()
-        
-        
-    # Global function define
-    def GlobalFunction(self):                 
-        self.globals.define("clock", ClockCallable())
-        self.globals.define("clear", ClearCallable())
-        self.globals.define("quit", QuitCallable())
-        self.globals.define("str", StrCallable())
-    
+        self.locals = {}     # expr/declaration -> (depth, slot), slot is None for globals
+        self.scopeSizes = {} # block/function -> number of slots
+        self.tailCalls = {}  # return statement -> the self call it returns
+        self.memoSize = 0    # results kept per pure function, 0 turns memoization off
+        self.pureFunctions = set()
+        self.memoized = []   # LoxFunctions with a memo cache, for memoStats
+        self.stats = None    # Stats, when instrumented with --stats
+        self.output = Output() # where put writes to
+    
+    # Resolver hooks
+    def resolve(self, node, depth, slot):
+        self.locals[node] = (depth, slot)
+
+    def resolveScope(self, node, size):
+        self.scopeSizes[node] = size
+
+    def resolveTailCall(self, stmt, call):
+        self.tailCalls[stmt] = call
+
+    def forget(self, statement):
+        # Drops what the resolver recorded for a top-level statement that has
+        # run, so --stream does not keep every node it parsed alive. Function
+        # bodies are kept: the function can still be called later.
+        pending = [statement]
+        while pending:
+            node = pending.pop()
+            if node.__class__ is list:
+                pending.extend(node)
+            elif node.__class__ in nodeClasses and node.__class__ is not Function:
+                self.locals.pop(node, None)
+                self.scopeSizes.pop(node, None)
+                self.tailCalls.pop(node, None)
+                pending.extend(getattr(node, field) for field in node.__slots__)
+
+    # Purity analysis hook
+    def markPure(self, stmt):
+        self.pureFunctions.add(stmt)
+
+    def memoStats(self):
+        # function name -> {"hits", "misses", "size", "maxSize"}
+        return {str(function): function.memoStats() for function in self.memoized}
+
+    def newEnvironment(self, node, enclosing):
+        size = self.scopeSizes.get(node)
+        if size is None: return Environment(enclosing)
+        return LocalEnvironment(size, enclosing)
+
+    def lookUpVariable(self, name, expr):
+        location = self.locals.get(expr)
+        if location is None:
+            return self.environment.get(name)
+        depth, slot = location
+        if slot is None:
+            value = self.globals.get(name)
+            if name.lexeme not in self.globals.mutable:
+                expr.cache = (self.globals.version, value)
+            return value
+        environment = self.environment
+        while depth:
+            environment = environment.enclosing
+            depth -= 1
+        return environment.values[slot]
+
+    def declare(self, stmt, name, value):
+        location = self.locals.get(stmt)
+        if location is None:
+            self.environment.define(name.lexeme, value)
+        else:
+            self.environment.values[location[1]] = value
+
     # Error Handling for expression
     def checkNumberOperand_unary(self, operator, operand):
         if isinstance(operand, float): return
@@ -635,7 +710,13 @@ class Interpreter(ExprVisitor, StmtVisitor):
     
     def visit_assign_expr(self, expr):
         value = self.evaluate(expr.value)
-        self.environment.assign(expr.name, value)
+        location = self.locals.get(expr)
+        if location is None:
+            self.environment.assign(expr.name, value)
+        elif location[1] is None:
+            self.globals.assign(expr.name, value)
+        else:
+            self.environment.assignAt(location[0], location[1], value)
         return value
     
     
@@ -659,82 +740,81 @@ class Interpreter(ExprVisitor, StmtVisitor):
     
     def visit_call_expr(self, expr):
         callee = self.evaluate(expr.callee)
+        arguments = [argument.accept(self) for argument in expr.arguments]
         
-        arguments = []
-        for argument in expr.arguments:
-            arguments.append(self.evaluate(argument))
-    
+        # Lox functions skip the isinstance check against the ABC and the arity() call
+        if callee.__class__ is LoxFunction:
+            if len(arguments) != callee.paramCount:
+                raise LOX_RuntimeError(expr.paren, "Expected " + str(callee.paramCount) + " arguments but got "+ str(len(arguments)) + ".")
+            return callee.call(self, arguments)
         
+        return self.call(callee, arguments, expr.paren)
+    
+    def call(self, callee, arguments, paren):
         if not isinstance(callee, LoxCallable):
-            raise LOX_RuntimeError(expr.paren, "Can only call functions and classes. ")
+            raise LOX_RuntimeError(paren, "Can only call functions and classes. ")
         
         function = callee
         
         if len(arguments) != function.arity():
-            raise LOX_RuntimeError(expr.paren, "Expected " + function.arity() + " arguments but got "+ len(arguments) + ".")
+            raise LOX_RuntimeError(paren, "Expected " + str(function.arity()) + " arguments but got "+ str(len(arguments)) + ".")
         
+        if function.__class__ is not LoxFunction: arguments = flattenAll(arguments)
         return function.call(self, arguments)
     
     def visit_variable_expr(self, expr):
-        return self.environment.get(expr.name)
+        # inline cache of a global, good until the next define()
+        cache = expr.cache
+        if cache is not None and cache[0] == self.globals.version:
+            return cache[1]
+        return self.lookUpVariable(expr.name, expr)
     
     def visit_binary_expr(self, expr):
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
         
+        # operators on two numbers: one indexed lookup, then a C-level call
+        function = numberOperators[expr.operator.type]
+        if function is not None:
+            if isinstance(left, float) and isinstance(right, float):
+                return function(left, right)
+            self.checkNumberOperand_binary(expr.operator, left, right)
+        
         match expr.operator.type:
-            case TokenType.GREATER:
-                self.checkNumberOperand_binary(expr.operator, left, right)
-                return left > right
-            case TokenType.GREATER_EQUAL:
-                self.checkNumberOperand_binary(expr.operator, left, right)
-                return left >= right
-            case TokenType.LESS:
-                self.checkNumberOperand_binary(expr.operator, left, right)
-                return left < right
-            case TokenType.LESS_EQUAL:
-                self.checkNumberOperand_binary(expr.operator, left, right)
-                return left <= right
             case TokenType.BANG_EQUAL:
                 return not self.isEqual(left, right)
             case TokenType.EQUAL_EQUAL:
                 return self.isEqual(left, right)
-            case TokenType.MINUS:
-                self.checkNumberOperand_binary(expr.operator, left, right)
-                return left - right
             case TokenType.PLUS:
                 if isinstance(left, float) and isinstance(right, float):
                     return left + right
-                if isinstance(left, str) and isinstance(right, str):
-                    return left + right
+                if isString(left) and isString(right):
+                    return concat(left, right)
                 raise LOX_RuntimeError(expr.operator, "Operand must be two numbers or two strings")
-            case TokenType.SLASH:
-                self.checkNumberOperand_binary(expr.operator, left, right)
-                return left / right
-            case TokenType.STAR:
-                self.checkNumberOperand_binary(expr.operator, left, right)
-                return left * right
         
         return None
     
     # other methods for statements
+    # Statements return None, or a 1-tuple holding the value of an executed
+    # `return`, which is handed back up until LoxFunction.call unwraps it
     def execute(self, stmt):
-        stmt.accept(self)
+        return stmt.accept(self)
         
     def executeBlock(self, statements, environment):
         previous = self.environment
         try:
             self.environment = environment
             for statement in statements: 
-                self.execute(statement)
+                completion = statement.accept(self)
+                if completion is not None: return completion
+            return None
         finally:
             self.environment = previous
                 
     
     # Visitor patterns (override methods for statements)
     def visit_block_stmt(self, stmt):
-        self.executeBlock(stmt.statements, Environment(self.environment))
-        return None
+        return self.executeBlock(stmt.statements, self.newEnvironment(stmt, self.environment))
     
     def visit_expression_stmt(self, stmt):
         self.evaluate(stmt.expression)
@@ -742,7 +822,7 @@ class Interpreter(ExprVisitor, StmtVisitor):
     
     def visit_put_stmt(self, stmt):
         value = self.evaluate(stmt.expression)
-        print(self.stringify(value))
+        self.output.write(self.stringify(value))
         return None
     
     def visit_var_stmt(self, stmt):
@@ -750,67 +830,244 @@ class Interpreter(ExprVisitor, StmtVisitor):
         if stmt.initializer !=  None:
             value = self.evaluate(stmt.initializer)
         
-        self.environment.define(stmt.name.lexeme, value)
+        self.declare(stmt, stmt.name, value)
         return None
     
     def visit_if_stmt(self, stmt):
         if self.isTruthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.thenBranch)
+            return self.execute(stmt.thenBranch)
         elif stmt.elseBranch != None:
-            self.execute(stmt.elseBranch)
+            return self.execute(stmt.elseBranch)
         return None
 
     def visit_while_stmt(self, stmt):
         while self.isTruthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+            completion = self.execute(stmt.body)
+            if completion is not None: return completion
         return None
     
     def visit_return_stmt(self, stmt):
+        call = self.tailCalls.get(stmt)
+        if call is not None: return self.tailCall(call)
+
         value = None
         if stmt.value != None: value = self.evaluate(stmt.value);
 
-        raise ReturnException(value)
+        return (value,)
+    
+    def tailCall(self, call):
+        # `return f(...)`: instead of calling f here, hand (f, arguments) back
+        # to the LoxFunction.call loop, which runs it in place of this frame
+        callee = self.evaluate(call.callee)
+        arguments = [argument.accept(self) for argument in call.arguments]
+        if callee.__class__ is LoxFunction and len(arguments) == callee.paramCount:
+            return (callee, arguments)
+        return (self.call(callee, arguments, call.paren),)
     
     def visit_function_stmt(self, stmt):
-        function = LoxFunction(stmt)
-        self.environment.define(stmt.name.lexeme, function)
+        function = LoxFunction(stmt, self.scopeSizes.get(stmt))
+        if self.memoSize and stmt in self.pureFunctions:
+            function.memoize(self.memoSize)
+            self.memoized.append(function)
+        self.declare(stmt, stmt.name, function)
         
         return None
     
     # Interperter
     def interpret(self, statements, lox):
+        # returns the completion of a top-level `return`, which ends the script
         try:
             for statement in statements:
-                self.execute(statement)
+                completion = self.execute(statement)
+                if completion is not None: return completion
         except LOX_RuntimeError as error:
             lox.errorRuntime(error)
+        return None
 
 ## Application class  
 class Lox: 
     
-    def __init__(self):
+    def __init__(self, engine="tree"):
         self.hadError = False
         self.hadRuntimeError = False
+        self.engine = engine
+        self.scanner = "char"
+        self.useCache = True
+        self.streaming = False
+        self.optimize = False
+        self.profile = None # collapsed-stack file, set by --profile
+        self.statsFile = None # JSON counters file ("-" for stderr), set by --stats
+        self.timings = None # Timings being recorded (--timings, runTimed)
+        self.cache = None # ProgramCache, set up by run_file
         self.interpreter = Interpreter()
+        self.vm = VM(self.interpreter)
     
     # Run methods
     def run(self, source):
+        # errors of an earlier run (REPL, embedding) do not stick
+        self.hadError = False
+        self.hadRuntimeError = False
+        statements = self.parse(source)
+        if statements is None: return
+        self.execute(statements)
+    
+    def runTimed(self, source):
+        # run() with every phase measured; returns the Timings
+        self.timings = Timings()
+        try:
+            self.run(source)
+        finally:
+            timings, self.timings = self.timings, None
+        return timings
+    
+    def phase(self, name):
+        # a streamed run is measured as a whole (see run_file)
+        if self.timings is None or self.streaming: return nullcontext()
+        return self.timings.phase(name)
+    
+    def run_stream(self, file):
+        # Each statement runs as soon as it is parsed; after a syntax error
+        # the rest is still parsed (to report errors) but no longer run.
+        # The output is flushed once at the end, not after every statement.
+        parser = StreamParser(StreamScanner(file, self), self)
+        try:
+            for statement in parser.parseStream():
+                if self.hadError: continue
+                completion = self.runEngine([statement])
+                # nothing looks the statement up again once it has run
+                self.interpreter.forget(statement)
+                # a top-level `return` ends the script here too
+                if completion is not None: break
+                if self.hadRuntimeError: break
+        finally:
+            self.interpreter.output.flush()
+    
+    def execute(self, statements):
+        # returns the completion of a top-level `return`, None without one
+        try:
+            return self.runEngine(statements)
+        finally:
+            # also reached through an error that escapes the engine
+            self.interpreter.output.flush()
+    
+    def runEngine(self, statements):
+        # Python's stack running out (RecursionError) is reported as a Lox
+        # error: a syntax error while optimizing, resolving or compiling,
+        # before anything ran, and a runtime error while running
+        if self.optimize:
+            with self.phase("optimize"):
+                try:
+                    statements = Optimizer().optimize(statements)
+                except RecursionError:
+                    return self.nestedTooDeeply(statements)
+        
+        if self.engine == "vm":
+            with self.phase("compile"):
+                try:
+                    chunk = Compiler().compile(statements)
+                except RecursionError:
+                    return self.nestedTooDeeply(statements)
+            with self.phase("execute"):
+                return self.vm.interpret(chunk, self)
+        
+        if self.engine == "closure":
+            with self.phase("compile"):
+                try:
+                    script = ClosureCompiler(self.interpreter).compile(statements)
+                except RecursionError:
+                    return self.nestedTooDeeply(statements)
+            with self.phase("execute"):
+                try:
+                    return script()
+                except LOX_RuntimeError as error:
+                    self.errorRuntime(error)
+                    return None
+                except RecursionError:
+                    return self.stackOverflow(statements)
+        
+        if self.engine == "python":
+            with self.phase("execute"):
+                try:
+                    completion = runPython(statements, self.interpreter)
+                    if completion is not False: return completion
+                except LOX_RuntimeError as error:
+                    self.errorRuntime(error)
+                    return None
+                except RecursionError:
+                    return self.stackOverflow(statements)
+            # nested deeper than CPython compiles: run it on the tree engine below
         
-        scanner = Scanner(source,self)
-        tokens = scanner.scanTokens()
+        if self.engine == "stack":
+            with self.phase("execute"):
+                try:
+                    return StackInterpreter(self.interpreter).interpret(statements)
+                except LOX_RuntimeError as error:
+                    self.errorRuntime(error)
+                    return None
+        
+        with self.phase("resolve"):
+            try:
+                resolver = Resolver(self.interpreter)
+                resolver.resolve(statements)
+                # purity needs the whole program, which a stream never shows at once
+                if self.interpreter.memoSize and not self.streaming:
+                    PurityAnalyzer(self.interpreter).analyze(statements)
+            except RecursionError:
+                return self.nestedTooDeeply(statements)
+        
+        with self.phase("execute"):
+            try:
+                return self.interpreter.interpret(statements, self)
+            except RecursionError:
+                return self.stackOverflow(statements)
+    
+    def nestedTooDeeply(self, statements):
+        # reported like the parser's own limit (Parser.topDeclaration)
+        token = deepestToken(statements)
+        if token is None: self.error(1, "Nested too deeply.")
+        else: self.errorToken(token, "Nested too deeply.")
+        return None
+    
+    def stackOverflow(self, statements):
+        # calls report the function that overflowed (LoxFunction.call), so
+        # this is deep nesting outside any function
+        token = deepestToken(statements) or Token(TokenType.EOF, "", None, 1)
+        self.errorRuntime(LOX_RuntimeError(token, "Stack overflow."))
+        return None
+    
+    def parse(self, source):
+        if self.cache is not None and not DEBUG:
+            with self.phase("cache"):
+                statements = self.cache.load(source)
+            if statements is not None:
+                if self.timings is not None: self.timings.nodes = countNodes(statements)
+                return statements
+        
+        with self.phase("scan"):
+            if self.scanner == "regex":
+                scanner = RegexScanner(source, self)
+            else:
+                scanner = Scanner(source,self)
+            tokens = scanner.scanTokens()
+        if self.timings is not None: self.timings.tokens = len(tokens)
 
         if DEBUG:
             for token in tokens: 
                 print(token)
-            return
+            return None
         
-        parser = Parser(tokens, self)
-        statements = parser.parse()
+        with self.phase("parse"):
+            parser = Parser(tokens, self)
+            statements = parser.parse()
         
-        if self.hadError: return
-        self.interpreter.interpret(statements, self)
+        if self.hadError: return None
+        if self.timings is not None: self.timings.nodes = countNodes(statements)
+        if self.cache is not None:
+            self.cache.store(source, statements)
+        return statements
        
     def run_prompt(self):
+        self.interpreter.output.bufferSize = 0
         while True:
             prompt = ">> "
             line = input(prompt)
@@ -822,12 +1079,33 @@ class Lox:
             self.hadError = False
             
     def run_file(self, path):
+        if self.streaming:
+            with open(path, 'r', encoding='utf-8', newline='') as file:
+                with self.timings.phase("stream") if self.timings is not None else nullcontext():
+                    self.run_stream(file)
+            if self.hadError: sys.exit(65)
+            if self.hadRuntimeError: sys.exit(70)
+            return
+        if self.useCache:
+            self.cache = ProgramCache(os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR))
         with open(path, 'rb') as file:
             bytes_data = file.read()
             self.run(bytes_data.decode('utf-8'))
             if self.hadError: sys.exit(65)
             if self.hadRuntimeError: sys.exit(70)
     
+    def run_profiled(self, path):
+        profiler = Profiler()
+        profiler.start()
+        try:
+            self.run_file(path)
+        finally:
+            # also reached through the sys.exit of a failing script
+            profiler.stop()
+            profiler.writeCollapsed(self.profile)
+            profiler.report(sys.stderr)
+            print("Collapsed stacks written to " + self.profile, file=sys.stderr)
+    
     # Error handling
     def error(self, line, message): 
         self.report(line, "", message)
@@ -839,22 +1117,81 @@ class Lox:
             self.report(token.line, " at '" + token.lexeme + "'", message)
 
     def errorRuntime(self, error):
-        print("[line " + str(error.token.line) + "] Error: " + error.args[0])
+        self.interpreter.output.write("[line " + str(error.token.line) + "] Error: " + error.args[0])
         self.hadRuntimeError = True
     
     def report(self, line, where, message):
-        print("[line " + str(line) + "] Error" + str(where) + ": " + message)
+        output = self.interpreter.output
+        output.write("[line " + str(line) + "] Error" + str(where) + ": " + message)
+        output.flush()
         self.hadError = True
     
     # Main function for lox interpreter
     def main(self, argc, argv):
-        if argc > 2: 
-            print("Usage: python lox.py [script]")
+        args = self.parseOptions(argv[1:argc])
+        if args is None or len(args) > 1: 
+            print("Usage: python lox.py [--engine=tree|vm|closure|python|stack] [--scanner=char|regex] [--no-cache] [--stream] [-O] [--memo[=size]] [--profile[=file]] [--stats[=file]] [--timings] [script]")
             sys.exit(64)
-        elif argc == 2: 
-            self.run_file(argv[1])
+        elif len(args) == 1: 
+            if self.statsFile is not None: Stats(self.interpreter)
+            # someone is watching: show every line as soon as it is put
+            if sys.stdout.isatty(): self.interpreter.output.bufferSize = 0
+            try:
+                if self.profile is not None:
+                    self.run_profiled(args[0])
+                else:
+                    self.run_file(args[0])
+            finally:
+                if self.statsFile is not None: self.writeStats()
+                if self.timings is not None: self.timings.report(sys.stderr)
         else:
             self.run_prompt()
+    
+    def writeStats(self):
+        if self.statsFile == "-":
+            self.interpreter.stats.write(sys.stderr)
+            return
+        with open(self.statsFile, "w") as file:
+            self.interpreter.stats.write(file)
+    
+    def parseOptions(self, argv):
+        args = []
+        for arg in argv:
+            if arg.startswith("--engine="):
+                engine = arg[len("--engine="):]
+                if engine not in ENGINES: return None
+                self.engine = engine
+            elif arg.startswith("--scanner="):
+                scanner = arg[len("--scanner="):]
+                if scanner not in SCANNERS: return None
+                self.scanner = scanner
+            elif arg == "--no-cache":
+                self.useCache = False
+            elif arg == "--stream":
+                self.streaming = True
+            elif arg == "-O":
+                self.optimize = True
+            elif arg == "--memo":
+                self.interpreter.memoSize = MEMO_SIZE
+            elif arg.startswith("--memo="):
+                size = arg[len("--memo="):]
+                if not size.isdigit(): return None
+                self.interpreter.memoSize = int(size)
+            elif arg == "--timings":
+                self.timings = Timings()
+            elif arg == "--stats":
+                self.statsFile = "-"
+            elif arg.startswith("--stats="):
+                self.statsFile = arg[len("--stats="):]
+            elif arg == "--profile":
+                self.profile = PROFILE_FILE
+            elif arg.startswith("--profile="):
+                self.profile = arg[len("--profile="):]
+            elif arg.startswith("-"):
+                return None
+            else:
+                args.append(arg)
+        return args
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+import operator
+from Expr import ExprVisitor, Literal
+from Stmt import StmtVisitor, Block
+from Token import TokenType
+
+# Binary operators folded when both operands are number literals
+numberOperators = {
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.MINUS: operator.sub,
+    TokenType.PLUS: operator.add,
+    TokenType.STAR: operator.mul,
+}
+
+def isTruthy(value):
+    if value is None: return False
+    if isinstance(value, bool): return value
+    return True
+
+
+## Optimizer (optional pass between the parser and the engines, -O)
+# Folds constant Binary/Unary/Logical expressions, drops Grouping nodes and
+# prunes If/While branches whose condition is a literal. Anything that would
+# raise at runtime ("a" - 1, 1 / 0) is left alone so it still fails at the
+# same line when it is reached. Statement visitors return the replacement
+# statement, or None when it can be removed.
+class Optimizer(ExprVisitor, StmtVisitor):
+
+    def optimize(self, statements):
+        optimized = []
+        for statement in statements:
+            statement = statement.accept(self)
+            if statement is not None:
+                optimized.append(statement)
+        return optimized
+
+    def branch(self, stmt):
+        # a branch that disappeared still needs a statement in its place
+        stmt = stmt.accept(self)
+        return Block([]) if stmt is None else stmt
+
+    # Visitor patterns (statements)
+    def visit_block_stmt(self, stmt):
+        stmt.statements = self.optimize(stmt.statements)
+        return stmt
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression = stmt.expression.accept(self)
+        return stmt
+
+    def visit_function_stmt(self, stmt):
+        stmt.body = self.optimize(stmt.body)
+        return stmt
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition = stmt.condition.accept(self)
+        if isinstance(stmt.condition, Literal):
+            if isTruthy(stmt.condition.value):
+                return stmt.thenBranch.accept(self)
+            if stmt.elseBranch is None:
+                return None
+            return stmt.elseBranch.accept(self)
+        stmt.thenBranch = self.branch(stmt.thenBranch)
+        if stmt.elseBranch is not None:
+            stmt.elseBranch = self.branch(stmt.elseBranch)
+        return stmt
+
+    def visit_put_stmt(self, stmt):
+        stmt.expression = stmt.expression.accept(self)
+        return stmt
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is not None:
+            stmt.value = stmt.value.accept(self)
+        return stmt
+
+    def visit_var_stmt(self, stmt):
+        if stmt.initializer is not None:
+            stmt.initializer = stmt.initializer.accept(self)
+        return stmt
+
+    def visit_while_stmt(self, stmt):
+        stmt.condition = stmt.condition.accept(self)
+        if isinstance(stmt.condition, Literal) and not isTruthy(stmt.condition.value):
+            return None
+        stmt.body = self.branch(stmt.body)
+        return stmt
+
+    # Visitor patterns (expressions)
+    def visit_assign_expr(self, expr):
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_binary_expr(self, expr):
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+        if not (isinstance(expr.left, Literal) and isinstance(expr.right, Literal)):
+            return expr
+
+        left, right, type = expr.left.value, expr.right.value, expr.operator.type
+        if type == TokenType.EQUAL_EQUAL:
+            return Literal(left == right)
+        if type == TokenType.BANG_EQUAL:
+            return Literal(not left == right)
+        if isinstance(left, float) and isinstance(right, float):
+            if type in numberOperators:
+                return Literal(numberOperators[type](left, right))
+            if type == TokenType.SLASH and right != 0:
+                return Literal(left / right)
+        elif type == TokenType.PLUS and isinstance(left, str) and isinstance(right, str):
+            return Literal(left + right)
+        return expr
+
+    def visit_call_expr(self, expr):
+        expr.callee = expr.callee.accept(self)
+        expr.arguments = [argument.accept(self) for argument in expr.arguments]
+        return expr
+
+    def visit_grouping_expr(self, expr):
+        return expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        return expr
+
+    def visit_logical_expr(self, expr):
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+        if not isinstance(expr.left, Literal):
+            return expr
+        # the right operand only runs when the left one does not decide
+        if isTruthy(expr.left.value) == (expr.operator.type == TokenType.OR):
+            return expr.left
+        return expr.right
+
+    def visit_unary_expr(self, expr):
+        expr.right = expr.right.accept(self)
+        if not isinstance(expr.right, Literal):
+            return expr
+        value = expr.right.value
+        if expr.operator.type == TokenType.BANG:
+            return Literal(not isTruthy(value))
+        if isinstance(value, float):
+            return Literal(-value)
+        return expr
+
+    def visit_variable_expr(self, expr):
+        return expr
@@ -0,0 +1,38 @@
+import sys
+
+# Characters of `put` output held before they are written out
+OUTPUT_BUFFER = 64 * 1024
+
+
+## Output sink for `put` (Interpreter.output)
+# print() goes through the whole text I/O stack for every line. The sink
+# collects the lines in a list instead and writes them to the stream in one
+# call once `bufferSize` characters have piled up, and whenever flush() is
+# called: Lox flushes at the end of every run, after a syntax error and
+# before clearing the screen, and runtime errors are reported through the
+# sink so they stay in order with the output. With bufferSize 0 every line
+# is written and flushed at once (line buffering, used by the REPL and when
+# stdout is a terminal). Without a stream the lines go to whatever
+# sys.stdout is at the time they are written, so redirect_stdout still works;
+# pass an io.StringIO to keep the output in memory.
+class Output:
+
+    def __init__(self, stream=None, bufferSize=OUTPUT_BUFFER):
+        self.stream = stream
+        self.bufferSize = bufferSize
+        self.lines = []
+        self.size = 0
+
+    def write(self, line):
+        self.lines.append(line)
+        self.size += len(line)
+        if self.size >= self.bufferSize: self.flush()
+
+    def flush(self):
+        if not self.lines: return
+        stream = sys.stdout if self.stream is None else self.stream
+        self.lines.append("")
+        stream.write("\n".join(self.lines))
+        stream.flush()
+        self.lines = []
+        self.size = 0
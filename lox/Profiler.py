@@ -0,0 +1,99 @@
+import sys, threading
+from collections import Counter
+from Token import Token
+from Callable import LoxFunction
+
+# Default sampling interval (seconds) and length of the hot lists
+PROFILE_INTERVAL = 0.001
+PROFILE_TOP = 10
+
+# Fields of Expr/Stmt nodes that hold a token, tried in order for a line number
+TOKEN_FIELDS = ("operator", "paren", "keyword", "name")
+
+def nodeLine(node):
+    for field in TOKEN_FIELDS:
+        token = getattr(node, field, None)
+        if isinstance(token, Token): return token.line
+    return None
+
+
+## Sampling profiler (--profile)
+# A background thread wakes up every `interval` seconds and looks at the
+# Python frames of the thread running the script: every LoxFunction.call
+# frame is a Lox call (named after Function.name), and the innermost
+# visit_* frame whose node carries a token gives the current line. The
+# interpreter itself is not instrumented, so nothing changes when the
+# profiler is off. Lox calls are only visible on the tree engine; on the
+# other engines every sample is attributed to <script>.
+class Profiler:
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter() # "<script>;f;g" -> samples
+        self.lines = Counter()  # (function, line) -> samples
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.target = threading.get_ident()
+        self.switchInterval = sys.getswitchinterval()
+        # let the sampler get the GIL about as often as it asks for it
+        sys.setswitchinterval(min(self.switchInterval, self.interval))
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        sys.setswitchinterval(self.switchInterval)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            if frame is not None: self.sample(frame)
+
+    def sample(self, frame):
+        functions = []
+        line = None
+        call = LoxFunction.call.__code__
+        while frame is not None:
+            code = frame.f_code
+            if code is call:
+                locals = frame.f_locals
+                # `function` changes on a tail call; it is not set yet on entry
+                function = locals.get("function") or locals["self"]
+                functions.append(function.declaration.name.lexeme)
+            elif line is None and not functions and code.co_name.startswith("visit_"):
+                locals = frame.f_locals
+                node = locals.get("expr") or locals.get("stmt")
+                if node is not None: line = nodeLine(node)
+            frame = frame.f_back
+        functions.append("<script>")
+        functions.reverse()
+        self.stacks[";".join(functions)] += 1
+        if line is not None: self.lines[(functions[-1], line)] += 1
+        self.samples += 1
+
+    # Output
+    def writeCollapsed(self, path):
+        # one "frame;frame;frame count" line per stack, as flamegraph.pl expects
+        with open(path, "w") as file:
+            for stack, count in sorted(self.stacks.items()):
+                file.write(f"{stack} {count}\n")
+
+    def hotFunctions(self):
+        counts = Counter()
+        for stack, count in self.stacks.items():
+            counts[stack.rsplit(";", 1)[-1]] += count
+        return counts
+
+    def report(self, file, top=PROFILE_TOP):
+        total = max(self.samples, 1)
+        print(f"{self.samples} samples, one every {self.interval * 1000:g} ms", file=file)
+        print("Hot functions (self samples):", file=file)
+        for name, count in self.hotFunctions().most_common(top):
+            print(f"  {count:8}  {count / total:6.1%}  {name}", file=file)
+        print("Hot lines:", file=file)
+        for (name, line), count in self.lines.most_common(top):
+            print(f"  {count:8}  {count / total:6.1%}  line {line} ({name})", file=file)
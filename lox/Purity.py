@@ -0,0 +1,141 @@
+from Expr import ExprVisitor, Variable
+from Stmt import StmtVisitor, Function
+from Callable import LoxCallable
+
+
+## Purity analysis (whole program, before the Interpreter runs it with --memo)
+# A top-level function is pure when its result depends only on its
+# arguments: it does not `put`, assigns only to its own locals, and the
+# only globals it reads are pure functions (itself included) or natives
+# marked `pure`. Functions whose global name is ever assigned or declared
+# again are left out, since a call through that name could then land
+# somewhere else. The pure declarations are handed to
+# interpreter.markPure; the others are simply never memoized.
+class PurityAnalyzer(ExprVisitor, StmtVisitor):
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.function = None # top-level function being analyzed
+        self.scopes = []     # names declared in each local scope
+        self.impure = set()
+        self.reads = {}      # function -> global names it reads
+        self.rebound = set() # names assigned to or declared more than once
+
+    def analyze(self, statements):
+        functions = {}
+        for statement in statements:
+            if isinstance(statement, Function):
+                if statement.name.lexeme in functions:
+                    self.rebound.add(statement.name.lexeme)
+                functions[statement.name.lexeme] = statement
+                self.reads[statement] = set()
+        self.walk(statements)
+
+        pure = {name: function for name, function in functions.items()
+                if function not in self.impure and name not in self.rebound}
+        changed = True
+        while changed:
+            changed = False
+            for name, function in list(pure.items()):
+                if not all(read in pure or self.isPureNative(read) for read in self.reads[function]):
+                    del pure[name]
+                    changed = True
+        for function in pure.values():
+            self.interpreter.markPure(function)
+
+    def isPureNative(self, name):
+        if name in self.rebound: return False
+        native = self.interpreter.globals.values.get(name)
+        return isinstance(native, LoxCallable) and native.pure
+
+    def walk(self, statements):
+        for statement in statements:
+            statement.accept(self)
+
+    def isLocal(self, name):
+        return any(name.lexeme in scope for scope in self.scopes)
+
+    def declare(self, name):
+        if self.scopes:
+            self.scopes[-1].add(name.lexeme)
+        else:
+            self.rebound.add(name.lexeme)
+
+    # Visitor patterns (statements)
+    def visit_block_stmt(self, stmt):
+        self.scopes.append(set())
+        self.walk(stmt.statements)
+        self.scopes.pop()
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression.accept(self)
+
+    def visit_function_stmt(self, stmt):
+        enclosingFunction, enclosingScopes = self.function, self.scopes
+        if self.scopes:
+            # a local function: never memoized, and makes its enclosing one impure
+            self.scopes[-1].add(stmt.name.lexeme)
+            if self.function is not None: self.impure.add(self.function)
+            self.function = None
+        else:
+            self.function = stmt
+        self.scopes = [set(param.lexeme for param in stmt.params)]
+        self.walk(stmt.body)
+        self.function, self.scopes = enclosingFunction, enclosingScopes
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition.accept(self)
+        stmt.thenBranch.accept(self)
+        if stmt.elseBranch is not None: stmt.elseBranch.accept(self)
+
+    def visit_put_stmt(self, stmt):
+        if self.function is not None: self.impure.add(self.function)
+        stmt.expression.accept(self)
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is not None: stmt.value.accept(self)
+
+    def visit_var_stmt(self, stmt):
+        # The initializer still sees the outer binding
+        if stmt.initializer is not None: stmt.initializer.accept(self)
+        self.declare(stmt.name)
+
+    def visit_while_stmt(self, stmt):
+        stmt.condition.accept(self)
+        stmt.body.accept(self)
+
+    # Visitor patterns (expressions)
+    def visit_assign_expr(self, expr):
+        expr.value.accept(self)
+        if self.isLocal(expr.name): return
+        self.rebound.add(expr.name.lexeme)
+        if self.function is not None: self.impure.add(self.function)
+
+    def visit_binary_expr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_call_expr(self, expr):
+        # only calls straight through a name can be followed
+        if not isinstance(expr.callee, Variable) and self.function is not None:
+            self.impure.add(self.function)
+        expr.callee.accept(self)
+        for argument in expr.arguments:
+            argument.accept(self)
+
+    def visit_grouping_expr(self, expr):
+        expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        pass
+
+    def visit_logical_expr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_unary_expr(self, expr):
+        expr.right.accept(self)
+
+    def visit_variable_expr(self, expr):
+        if self.function is not None and not self.isLocal(expr.name):
+            self.reads[self.function].add(expr.name.lexeme)
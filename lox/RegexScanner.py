@@ -0,0 +1,159 @@
+import re
+from Token import TokenType, Token, keywords
+
+# One alternative per kind of lexeme, tried in order
+LEXEMES = re.compile(r"""
+    (?P<NEWLINE>\n)
+  | (?P<WHITESPACE>[ \t\r]+)
+  | (?P<COMMENT>//[^\n]*)
+  | (?P<BLOCK_COMMENT>/\*.*?\*/)
+  | (?P<UNTERMINATED_COMMENT>/\*.*)
+  | (?P<NUMBER>[0-9]+(?:\.[0-9]+)?)
+  | (?P<IDENTIFIER>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<STRING>"[^"]*")
+  | (?P<UNTERMINATED_STRING>".*)
+  | (?P<OPERATOR>!=|==|<=|>=|[(){},.\-+;*/!=<>])
+  | (?P<UNEXPECTED>.)
+""", re.VERBOSE | re.DOTALL)
+
+operators = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "/": TokenType.SLASH,
+    "*": TokenType.STAR,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+}
+
+
+## Table-driven scanner
+# Consumes whole lexemes (identifiers, numbers, strings, comments, runs of
+# whitespace) with a single master regex instead of one method call per
+# character. Produces the same tokens, line numbers and errors as Scanner.
+class RegexScanner:
+
+    def __init__(self, source, lox):
+        self.source = source
+        self.line = 1
+        self.tokens = []
+        self.lox = lox
+
+    def scanTokens(self):
+        tokens = self.tokens
+        append = tokens.append
+        line = self.line
+        identifier = TokenType.IDENTIFIER
+        keyword = keywords.get
+
+        for match in LEXEMES.finditer(self.source):
+            kind = match.lastgroup
+            text = match.group()
+            if kind == "IDENTIFIER":
+                append(Token(keyword(text, identifier), text, None, line))
+            elif kind == "WHITESPACE" or kind == "COMMENT":
+                pass
+            elif kind == "OPERATOR":
+                append(Token(operators[text], text, None, line))
+            elif kind == "NEWLINE":
+                line += 1
+            elif kind == "NUMBER":
+                append(Token(TokenType.NUMBER, text, float(text), line))
+            elif kind == "STRING":
+                # the token carries the line of its closing quote
+                line += text.count("\n")
+                append(Token(TokenType.STRING, text, text[1:-1], line))
+            elif kind == "BLOCK_COMMENT":
+                line += text.count("\n")
+            elif kind == "UNTERMINATED_STRING":
+                line += text.count("\n")
+                self.lox.error(line, "Unterminated string. ")
+            elif kind == "UNTERMINATED_COMMENT":
+                line += text.count("\n")
+                self.lox.error(line, "Unterminated comment. ")
+            else:
+                self.lox.error(line, "Unexpected character.")
+
+        self.line = line
+        append(Token(TokenType.EOF, "", None, line))
+        return tokens
+
+
+## Streaming scanner
+# Reads the script from a file object in chunks and yields tokens on demand,
+# so the parser (and the interpreter) can start before the whole file has
+# been read. A lexeme that ends within LOOKAHEAD characters of the end of
+# the buffer might continue in the next chunk ("1." followed by "5", "="
+# followed by "="), so it is matched again once more input has been read.
+LOOKAHEAD = 2
+
+class StreamScanner:
+
+    def __init__(self, file, lox, chunkSize=64 * 1024):
+        self.file = file
+        self.chunkSize = chunkSize
+        self.line = 1
+        self.lox = lox
+
+    def __iter__(self):
+        buffer = ""
+        atEnd = False
+        line = self.line
+        identifier = TokenType.IDENTIFIER
+        keyword = keywords.get
+
+        while not atEnd:
+            chunk = self.file.read(self.chunkSize)
+            if chunk:
+                buffer += chunk
+            else:
+                atEnd = True
+            limit = len(buffer) if atEnd else len(buffer) - LOOKAHEAD
+            pos = 0
+
+            for match in LEXEMES.finditer(buffer):
+                if match.end() > limit:
+                    break # keep the tail for the next chunk
+                pos = match.end()
+                kind = match.lastgroup
+                text = match.group()
+                if kind == "IDENTIFIER":
+                    yield Token(keyword(text, identifier), text, None, line)
+                elif kind == "WHITESPACE" or kind == "COMMENT":
+                    pass
+                elif kind == "OPERATOR":
+                    yield Token(operators[text], text, None, line)
+                elif kind == "NEWLINE":
+                    line += 1
+                elif kind == "NUMBER":
+                    yield Token(TokenType.NUMBER, text, float(text), line)
+                elif kind == "STRING":
+                    line += text.count("\n")
+                    yield Token(TokenType.STRING, text, text[1:-1], line)
+                elif kind == "BLOCK_COMMENT":
+                    line += text.count("\n")
+                elif kind == "UNTERMINATED_STRING":
+                    line += text.count("\n")
+                    self.lox.error(line, "Unterminated string. ")
+                elif kind == "UNTERMINATED_COMMENT":
+                    line += text.count("\n")
+                    self.lox.error(line, "Unterminated comment. ")
+                else:
+                    self.lox.error(line, "Unexpected character.")
+
+            buffer = buffer[pos:]
+
+        self.line = line
+        yield Token(TokenType.EOF, "", None, line)
@@ -0,0 +1,162 @@
+from Expr import ExprVisitor, Call, Grouping, Variable
+from Stmt import StmtVisitor
+
+## Resolver (static pass between the parser and the interpreter)
+# Every local variable gets a (depth, slot) pair: depth is how many scopes to
+# walk up from the current one, slot is the index in that scope's array.
+# Anything not found in a local scope is marked as a global.
+# `return f(...)` inside f itself is marked as a tail call.
+class Resolver(ExprVisitor, StmtVisitor):
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.scopes = [] # each scope maps name -> slot
+        self.sizes = []  # number of slots handed out in each scope
+        self.function = None # innermost function being resolved
+
+    def resolve(self, statements):
+        for statement in statements:
+            self.resolveStmt(statement)
+
+    def resolveStmt(self, stmt):
+        stmt.accept(self)
+
+    def resolveExpr(self, expr):
+        expr.accept(self)
+
+    # Scopes
+    def beginScope(self):
+        self.scopes.append({})
+        self.sizes.append(0)
+
+    def endScope(self):
+        self.scopes.pop()
+        return self.sizes.pop()
+
+    def declare(self, name):
+        # Every declaration gets a fresh slot, so redeclaring a name (or a
+        # duplicated parameter) shadows the old one exactly like the dict did
+        if not self.scopes: return None
+        slot = self.sizes[-1]
+        self.scopes[-1][name.lexeme] = slot
+        self.sizes[-1] += 1
+        return slot
+
+    def resolveLocal(self, expr, name):
+        for depth in range(len(self.scopes)):
+            scope = self.scopes[-1 - depth]
+            if name.lexeme in scope:
+                self.interpreter.resolve(expr, depth, scope[name.lexeme])
+                return
+        # not a local: it lives in the globals, looked up by name
+        self.interpreter.resolve(expr, None, None)
+
+    def resolveFunction(self, function):
+        # Functions only close over the globals (see LoxFunction.call),
+        # so the enclosing local scopes are hidden while resolving the body
+        enclosingScopes, enclosingSizes, enclosingFunction = self.scopes, self.sizes, self.function
+        self.scopes, self.sizes, self.function = [], [], function
+        self.beginScope()
+        for param in function.params:
+            self.declare(param)
+        self.resolve(function.body)
+        self.interpreter.resolveScope(function, self.endScope())
+        self.scopes, self.sizes, self.function = enclosingScopes, enclosingSizes, enclosingFunction
+
+    def selfCall(self, expr):
+        # A call to the global that names the function being resolved. It can
+        # still be rebound at runtime, so the interpreter checks the callee again
+        while isinstance(expr, Grouping):
+            expr = expr.expression
+        if self.function is None or not isinstance(expr, Call): return None
+        callee = expr.callee
+        if not isinstance(callee, Variable) or callee.name.lexeme != self.function.name.lexeme:
+            return None
+        if any(callee.name.lexeme in scope for scope in self.scopes): return None
+        return expr
+
+    # Visitor patterns (statements)
+    def visit_block_stmt(self, stmt):
+        self.beginScope()
+        self.resolve(stmt.statements)
+        self.interpreter.resolveScope(stmt, self.endScope())
+        return None
+
+    def visit_expression_stmt(self, stmt):
+        self.resolveExpr(stmt.expression)
+        return None
+
+    def visit_function_stmt(self, stmt):
+        slot = self.declare(stmt.name)
+        if slot is not None:
+            self.interpreter.resolve(stmt, 0, slot)
+        self.resolveFunction(stmt)
+        return None
+
+    def visit_if_stmt(self, stmt):
+        self.resolveExpr(stmt.condition)
+        self.resolveStmt(stmt.thenBranch)
+        if stmt.elseBranch is not None: self.resolveStmt(stmt.elseBranch)
+        return None
+
+    def visit_put_stmt(self, stmt):
+        self.resolveExpr(stmt.expression)
+        return None
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is not None:
+            self.resolveExpr(stmt.value)
+            call = self.selfCall(stmt.value)
+            if call is not None: self.interpreter.resolveTailCall(stmt, call)
+        return None
+
+    def visit_var_stmt(self, stmt):
+        # The initializer still sees the outer binding, as it did at runtime
+        if stmt.initializer is not None:
+            self.resolveExpr(stmt.initializer)
+        slot = self.declare(stmt.name)
+        if slot is not None:
+            self.interpreter.resolve(stmt, 0, slot)
+        return None
+
+    def visit_while_stmt(self, stmt):
+        self.resolveExpr(stmt.condition)
+        self.resolveStmt(stmt.body)
+        return None
+
+    # Visitor patterns (expressions)
+    def visit_assign_expr(self, expr):
+        self.resolveExpr(expr.value)
+        self.resolveLocal(expr, expr.name)
+        return None
+
+    def visit_binary_expr(self, expr):
+        self.resolveExpr(expr.left)
+        self.resolveExpr(expr.right)
+        return None
+
+    def visit_call_expr(self, expr):
+        self.resolveExpr(expr.callee)
+        for argument in expr.arguments:
+            self.resolveExpr(argument)
+        return None
+
+    def visit_grouping_expr(self, expr):
+        self.resolveExpr(expr.expression)
+        return None
+
+    def visit_literal_expr(self, expr):
+        return None
+
+    def visit_logical_expr(self, expr):
+        self.resolveExpr(expr.left)
+        self.resolveExpr(expr.right)
+        return None
+
+    def visit_unary_expr(self, expr):
+        self.resolveExpr(expr.right)
+        return None
+
+    def visit_variable_expr(self, expr):
+        self.resolveLocal(expr, expr.name)
+        return None
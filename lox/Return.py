@@ -1,4 +0,0 @@
-class ReturnException(RuntimeError):
-    def __init__(self, value):
-        super().__init__()
-        self.value = value
\ No newline at end of file
@@ -0,0 +1,68 @@
+# Strings shorter than this are concatenated as plain Python strings; copying
+# them costs less than keeping their parts around
+ROPE_MIN = 256
+
+def isString(value):
+    return value.__class__ is str or value.__class__ is Rope
+
+def concat(left, right):
+    # `left + right` for two Lox strings, each a str or a Rope
+    if right.__class__ is Rope: right = right.flatten()
+    if left.__class__ is Rope: return left.append(right)
+    length = len(left) + len(right)
+    if length < ROPE_MIN: return left + right
+    return Rope([left, right], 2, length)
+
+def flattenAll(arguments):
+    # natives get plain Python strings
+    return [argument.flatten() if argument.__class__ is Rope else argument for argument in arguments]
+
+
+## Rope (a string built by repeated `+`)
+# `s = s + x` on Python strings copies all of `s` every time, so a loop that
+# builds a string is quadratic. A Rope keeps the parts in a list instead and
+# looks at its first `count` of them. Appending to the newest rope appends to
+# the list in place and shares it with the new rope; appending to an older
+# one (whose list has since grown past it) copies its own parts first, so a
+# rope never changes once made. The text is joined the first time it is
+# needed (put, ==, hashing, natives) and kept, and later appends start again
+# from it.
+class Rope:
+    __slots__ = ("parts", "count", "length", "text")
+
+    def __init__(self, parts, count, length):
+        self.parts = parts
+        self.count = count
+        self.length = length
+        self.text = None
+
+    def append(self, text):
+        if self.text is not None:
+            return Rope([self.text, text], 2, self.length + len(text))
+        parts = self.parts
+        if len(parts) != self.count: parts = parts[:self.count]
+        parts.append(text)
+        return Rope(parts, self.count + 1, self.length + len(text))
+
+    def flatten(self):
+        text = self.text
+        if text is None:
+            parts = self.parts
+            text = self.text = "".join(parts if len(parts) == self.count else parts[:self.count])
+            self.parts = None # the old parts are no longer needed by this rope
+        return text
+
+    __str__ = flatten
+
+    def __repr__(self):
+        return repr(self.flatten())
+
+    def __eq__(self, other):
+        if other.__class__ is Rope:
+            return self.length == other.length and self.flatten() == other.flatten()
+        if other.__class__ is str:
+            return self.length == len(other) and self.flatten() == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.flatten())
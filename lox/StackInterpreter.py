@@ -0,0 +1,275 @@
+import operator
+from Expr import ExprVisitor, Literal, Variable
+from Stmt import StmtVisitor
+from Token import TokenType
+from Callable import LoxCallable, LoxFunction
+from Environment import Environment, LOX_RuntimeError
+from Rope import isString, concat, flattenAll
+
+# Binary operators that take two numbers
+numberOperators = {
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.MINUS: operator.sub,
+    TokenType.SLASH: operator.truediv,
+    TokenType.STAR: operator.mul,
+}
+
+# Expressions evaluated in place instead of going through the work stack
+LEAVES = (Literal, Variable)
+
+
+## Explicit-stack interpreter (--engine=stack)
+# Runs the tree without recursing in Python: visiting a node only pushes
+# work onto self.work, a stack of (function, argument) pairs, and
+# intermediate results go to self.values. A 10k-term expression or a call
+# chain thousands of levels deep is then limited by memory rather than by
+# Python's recursion limit. Scopes are the dict-backed Environments (no
+# Resolver pass, which would recurse over the same tree).
+class StackInterpreter(ExprVisitor, StmtVisitor):
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.globals = interpreter.globals
+        self.environment = self.globals
+        self.work = []
+        self.values = []
+        self.completion = None # (value,) once a top-level `return` ended the script
+
+    def interpret(self, statements):
+        work = self.work
+        self.pushStatements(statements)
+        try:
+            while work:
+                function, argument = work.pop()
+                function(argument)
+        finally:
+            self.reset()
+        return self.completion
+
+    def slices(self, statements, steps):
+        # interpret() in slices: a generator that hands control back (yields)
+        # after every `steps` work items, for AsyncHost. The whole state of the
+        # run is in self.work and self.values, so it can stop at any step.
+        work = self.work
+        self.pushStatements(statements)
+        try:
+            while work:
+                budget = steps
+                while work and budget:
+                    function, argument = work.pop()
+                    function(argument)
+                    budget -= 1
+                if work: yield
+        finally:
+            self.reset()
+
+    def reset(self):
+        self.work.clear()
+        self.values.clear()
+        self.environment = self.globals
+
+    # Work stack (pushed in reverse: the last entry runs first)
+    def pushStatements(self, statements):
+        work = self.work
+        for statement in reversed(statements):
+            work.append((statement.accept, self))
+
+    def evaluate(self, expr):
+        self.work.append((expr.accept, self))
+
+    def then(self, function, argument=None):
+        self.work.append((function, argument))
+
+    # Continuations (run once the values they need are on self.values)
+    def restoreEnvironment(self, environment):
+        self.environment = environment
+
+    def discard(self, _):
+        self.values.pop()
+
+    def put(self, _):
+        self.interpreter.output.write(self.interpreter.stringify(self.values.pop()))
+
+    def define(self, stmt):
+        self.environment.define(stmt.name.lexeme, self.values.pop())
+
+    def assign(self, expr):
+        self.environment.assign(expr.name, self.values[-1])
+
+    def branch(self, stmt):
+        if self.interpreter.isTruthy(self.values.pop()):
+            self.then(stmt.thenBranch.accept, self)
+        elif stmt.elseBranch is not None:
+            self.then(stmt.elseBranch.accept, self)
+
+    def loop(self, stmt):
+        if self.interpreter.isTruthy(self.values.pop()):
+            # body, then the condition again, then back here
+            self.then(self.loop, stmt)
+            self.evaluate(stmt.condition)
+            self.then(stmt.body.accept, self)
+
+    def shortCircuit(self, expr):
+        left = self.values[-1]
+        if self.interpreter.isTruthy(left) == (expr.operator.type == TokenType.OR): return
+        self.values.pop()
+        self.evaluate(expr.right)
+
+    def unary(self, expr):
+        values = self.values
+        right = values[-1]
+        if expr.operator.type == TokenType.MINUS:
+            if not isinstance(right, float):
+                raise LOX_RuntimeError(expr.operator, "Operand must be a number.")
+            values[-1] = -right
+        else:
+            values[-1] = not self.interpreter.isTruthy(right)
+
+    def binary(self, expr):
+        values = self.values
+        right = values.pop()
+        left = values[-1]
+        type = expr.operator.type
+        function = numberOperators.get(type)
+        if function is not None:
+            if not (isinstance(left, float) and isinstance(right, float)):
+                raise LOX_RuntimeError(expr.operator, "Operands mush be numbers")
+            values[-1] = function(left, right)
+        elif type == TokenType.EQUAL_EQUAL:
+            values[-1] = self.interpreter.isEqual(left, right)
+        elif type == TokenType.BANG_EQUAL:
+            values[-1] = not self.interpreter.isEqual(left, right)
+        elif isinstance(left, float) and isinstance(right, float):
+            values[-1] = left + right
+        elif isString(left) and isString(right):
+            values[-1] = concat(left, right)
+        else:
+            raise LOX_RuntimeError(expr.operator, "Operand must be two numbers or two strings")
+
+    def call(self, expr):
+        values = self.values
+        argCount = len(expr.arguments)
+        arguments = values[len(values) - argCount:]
+        del values[len(values) - argCount:]
+        callee = values.pop()
+
+        if callee.__class__ is LoxFunction:
+            if argCount != callee.paramCount:
+                raise LOX_RuntimeError(expr.paren, "Expected " + str(callee.paramCount) + " arguments but got " + str(argCount) + ".")
+            # returnFrom unwinds to this entry; falling off the end yields nil
+            self.then(self.endCall, (self.environment, len(values)))
+            self.environment = Environment(self.globals)
+            self.environment.values = dict(zip(callee.params, arguments))
+            self.pushStatements(callee.body)
+            return
+
+        if not isinstance(callee, LoxCallable):
+            raise LOX_RuntimeError(expr.paren, "Can only call functions and classes. ")
+        if argCount != callee.arity():
+            raise LOX_RuntimeError(expr.paren, "Expected " + str(callee.arity()) + " arguments but got " + str(argCount) + ".")
+        values.append(callee.call(self.interpreter, flattenAll(arguments)))
+
+    def endCall(self, frame):
+        self.environment = frame[0]
+        self.values.append(None)
+
+    def returnFrom(self, _):
+        value = self.values.pop()
+        work = self.work
+        endCall = self.endCall
+        while work:
+            function, frame = work.pop()
+            if function == endCall:
+                self.environment = frame[0]
+                del self.values[frame[1]:]
+                self.values.append(value)
+                return
+        # a top-level `return` ends the script
+        self.completion = (value,)
+
+    # Visitor patterns (statements)
+    def visit_block_stmt(self, stmt):
+        self.then(self.restoreEnvironment, self.environment)
+        self.environment = Environment(self.environment)
+        self.pushStatements(stmt.statements)
+
+    def visit_expression_stmt(self, stmt):
+        self.then(self.discard)
+        self.evaluate(stmt.expression)
+
+    def visit_function_stmt(self, stmt):
+        self.environment.define(stmt.name.lexeme, LoxFunction(stmt))
+
+    def visit_if_stmt(self, stmt):
+        self.then(self.branch, stmt)
+        self.evaluate(stmt.condition)
+
+    def visit_put_stmt(self, stmt):
+        self.then(self.put)
+        self.evaluate(stmt.expression)
+
+    def visit_return_stmt(self, stmt):
+        self.then(self.returnFrom)
+        if stmt.value is None:
+            self.values.append(None)
+        else:
+            self.evaluate(stmt.value)
+
+    def visit_var_stmt(self, stmt):
+        self.then(self.define, stmt)
+        if stmt.initializer is None:
+            self.values.append(None)
+        else:
+            self.evaluate(stmt.initializer)
+
+    def visit_while_stmt(self, stmt):
+        self.then(self.loop, stmt)
+        self.evaluate(stmt.condition)
+
+    # Visitor patterns (expressions)
+    def visit_assign_expr(self, expr):
+        self.then(self.assign, expr)
+        self.evaluate(expr.value)
+
+    def visit_binary_expr(self, expr):
+        left, right = expr.left, expr.right
+        # operands that are plain literals or variables are read right away
+        if left.__class__ in LEAVES and right.__class__ in LEAVES:
+            self.values.append(self.leaf(left))
+            self.values.append(self.leaf(right))
+            self.binary(expr)
+            return
+        work = self.work
+        work.append((self.binary, expr))
+        work.append((right.accept, self))
+        work.append((left.accept, self))
+
+    def visit_call_expr(self, expr):
+        self.then(self.call, expr)
+        for argument in reversed(expr.arguments):
+            self.evaluate(argument)
+        self.evaluate(expr.callee)
+
+    def visit_grouping_expr(self, expr):
+        self.evaluate(expr.expression)
+
+    def visit_literal_expr(self, expr):
+        self.values.append(expr.value)
+
+    def visit_logical_expr(self, expr):
+        self.then(self.shortCircuit, expr)
+        self.evaluate(expr.left)
+
+    def visit_unary_expr(self, expr):
+        self.then(self.unary, expr)
+        self.evaluate(expr.right)
+
+    def visit_variable_expr(self, expr):
+        self.values.append(self.environment.get(expr.name))
+
+    def leaf(self, expr):
+        if expr.__class__ is Literal: return expr.value
+        return self.environment.get(expr.name)
@@ -0,0 +1,98 @@
+import json
+from collections import Counter
+from Environment import LocalEnvironment
+
+
+## Instrumentation counters (--stats)
+# Installing a Stats object replaces the visit_* methods and executeBlock of
+# one Interpreter instance with counting wrappers; an Interpreter that was
+# never instrumented runs its own methods untouched. Counted are node
+# evaluations per node type, variable reads and writes with the number of
+# scopes walked to reach them, calls per LoxFunction, and the environments
+# created for blocks and calls (every one of them is handed to executeBlock).
+class Stats:
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.nodes = Counter()        # node class -> evaluations
+        self.lookups = Counter()      # "get"/"assign" and local/global/dynamic
+        self.depths = Counter()       # scopes walked -> variable accesses
+        self.calls = Counter()        # function -> calls (tail calls included)
+        self.environments = Counter() # environment class -> allocations
+        self.bodies = {}              # id of a function body -> its label
+        interpreter.stats = self
+
+        for name in dir(interpreter):
+            if name.startswith("visit_"):
+                setattr(interpreter, name, self.countNode(getattr(interpreter, name)))
+        interpreter.visit_variable_expr = self.countAccess(interpreter.visit_variable_expr, "get")
+        interpreter.visit_assign_expr = self.countAccess(interpreter.visit_assign_expr, "assign")
+        interpreter.visit_function_stmt = self.recordFunction(interpreter.visit_function_stmt)
+        interpreter.executeBlock = self.countBlock(interpreter.executeBlock)
+
+    # Wrappers
+    def countNode(self, visit):
+        nodes = self.nodes
+        def counted(node):
+            nodes[node.__class__.__name__] += 1
+            return visit(node)
+        return counted
+
+    def countAccess(self, visit, kind):
+        def counted(expr):
+            self.lookups[kind] += 1
+            self.lookups[self.locate(expr)] += 1
+            return visit(expr)
+        return counted
+
+    def recordFunction(self, visit):
+        def recorded(stmt):
+            self.bodies[id(stmt.body)] = stmt.name.lexeme + " (line " + str(stmt.name.line) + ")"
+            return visit(stmt)
+        return recorded
+
+    def countBlock(self, executeBlock):
+        def counted(statements, environment):
+            self.environments[environment.__class__.__name__] += 1
+            function = self.bodies.get(id(statements))
+            if function is not None: self.calls[function] += 1
+            return executeBlock(statements, environment)
+        return counted
+
+    def locate(self, expr):
+        # where the variable lives, counting the scopes walked to get there
+        location = self.interpreter.locals.get(expr)
+        if location is not None:
+            depth, slot = location
+            if slot is None: return "global"
+            self.depths[depth] += 1
+            return "local"
+        # an unresolved name is looked up by name, so it can only be in a
+        # dict-backed scope; a LocalEnvironment's slots are passed over, as
+        # its get() and assign() pass the name on to the enclosing scope
+        environment, depth = self.interpreter.environment, 0
+        while environment.enclosing is not None and (isinstance(environment, LocalEnvironment) or expr.name.lexeme not in environment.values):
+            environment = environment.enclosing
+            depth += 1
+        self.depths[depth] += 1
+        return "dynamic"
+
+    # Report
+    def report(self):
+        return {
+            "nodes": dict(self.nodes.most_common()),
+            "variables": {
+                "get": self.lookups["get"],
+                "assign": self.lookups["assign"],
+                "local": self.lookups["local"],
+                "global": self.lookups["global"],
+                "dynamic": self.lookups["dynamic"],
+                "depth": {str(depth): count for depth, count in sorted(self.depths.items())},
+            },
+            "calls": dict(self.calls.most_common()),
+            "environments": dict(self.environments.most_common()),
+        }
+
+    def write(self, file):
+        json.dump(self.report(), file, indent=2)
+        file.write("\n")
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 
 class Stmt(ABC):
+	__slots__ = ()
 	@abstractmethod
 	def accept(self, visitor):
 		pass
@@ -39,18 +40,21 @@ class StmtVisitor:
 		pass
 
 class Block(Stmt):
+	__slots__ = ('statements',)
 	def __init__(self, statements):
 		self.statements = statements
 	def accept(self, visitor):
 		return visitor.visit_block_stmt(self)
 
 class Expression(Stmt):
+	__slots__ = ('expression',)
 	def __init__(self, expression):
 		self.expression = expression
 	def accept(self, visitor):
 		return visitor.visit_expression_stmt(self)
 
 class Function(Stmt):
+	__slots__ = ('name', 'params', 'body')
 	def __init__(self, name, params, body):
 		self.name = name
 		self.params = params
@@ -59,6 +63,7 @@ class Function(Stmt):
 		return visitor.visit_function_stmt(self)
 
 class If(Stmt):
+	__slots__ = ('condition', 'thenBranch', 'elseBranch')
 	def __init__(self, condition, thenBranch, elseBranch):
 		self.condition = condition
 		self.thenBranch = thenBranch
@@ -67,12 +72,14 @@ class If(Stmt):
 		return visitor.visit_if_stmt(self)
 
 class Put(Stmt):
+	__slots__ = ('expression',)
 	def __init__(self, expression):
 		self.expression = expression
 	def accept(self, visitor):
 		return visitor.visit_put_stmt(self)
 
 class Return(Stmt):
+	__slots__ = ('keyword', 'value')
 	def __init__(self, keyword, value):
 		self.keyword = keyword
 		self.value = value
@@ -80,6 +87,7 @@ class Return(Stmt):
 		return visitor.visit_return_stmt(self)
 
 class Var(Stmt):
+	__slots__ = ('name', 'initializer')
 	def __init__(self, name, initializer):
 		self.name = name
 		self.initializer = initializer
@@ -87,6 +95,7 @@ class Var(Stmt):
 		return visitor.visit_var_stmt(self)
 
 class While(Stmt):
+	__slots__ = ('condition', 'body')
 	def __init__(self, condition, body):
 		self.condition = condition
 		self.body = body
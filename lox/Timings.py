@@ -0,0 +1,82 @@
+import sys, time
+from contextlib import contextmanager
+from Expr import Expr
+from Stmt import Stmt
+
+try:
+    import resource
+except ImportError: # not on Windows
+    resource = None
+
+def maxResident():
+    # high-water mark of the process' resident memory, in bytes
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def countNodes(statements):
+    count = 0
+    pending = list(statements)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, list):
+            pending.extend(node)
+        elif isinstance(node, (Expr, Stmt)):
+            count += 1
+            pending.extend(getattr(node, field) for field in node.__slots__)
+    return count
+
+
+## One measured phase of a run
+class Phase:
+    def __init__(self, name, wall, cpu, maxResident, residentGrowth):
+        self.name = name
+        self.wall = wall                     # seconds
+        self.cpu = cpu                       # seconds of process CPU time
+        self.maxResident = maxResident       # bytes, the process' peak resident memory so far (None if unknown)
+        self.residentGrowth = residentGrowth # bytes the peak rose by during this phase (None if unknown)
+
+    def asDict(self):
+        return {"name": self.name, "wall": self.wall, "cpu": self.cpu, "maxResident": self.maxResident, "residentGrowth": self.residentGrowth}
+
+
+## Per-phase timings of one run (--timings, Lox.runTimed)
+# Phases are recorded in the order they ran: "cache" (a parse cache hit),
+# "scan", "parse", "optimize" (-O), "resolve" (tree engine), "compile"
+# (vm and closure engines) and "execute"; --stream records the whole
+# interleaved run as "stream". Memory is the process' peak resident set
+# so far, which costs nothing to read, and how far each phase raised it: a
+# phase that stays below an earlier peak shows no growth, however much it
+# allocates. Tracing allocations would slow the phases being measured
+# down several times.
+class Timings:
+
+    def __init__(self):
+        self.phases = []
+        self.tokens = None # None when the tokens never existed (cache hit)
+        self.nodes = None
+
+    @contextmanager
+    def phase(self, name):
+        wall, cpu, before = time.perf_counter(), time.process_time(), maxResident()
+        try:
+            yield
+        finally:
+            after = maxResident()
+            growth = None if after is None else after - before
+            self.phases.append(Phase(name, time.perf_counter() - wall, time.process_time() - cpu, after, growth))
+
+    def asDict(self):
+        return {"phases": [phase.asDict() for phase in self.phases], "tokens": self.tokens, "nodes": self.nodes}
+
+    def report(self, file):
+        print(f"{'phase':10} {'wall ms':>10} {'cpu ms':>10} {'max RSS so far MiB':>19} {'+MiB':>8}", file=file)
+        for phase in self.phases:
+            memory = "-" if phase.maxResident is None else f"{phase.maxResident / (1024 * 1024):.1f}"
+            growth = "-" if phase.residentGrowth is None else f"{phase.residentGrowth / (1024 * 1024):+.1f}"
+            print(f"{phase.name:10} {phase.wall * 1000:10.2f} {phase.cpu * 1000:10.2f} {memory:>19} {growth:>8}", file=file)
+        total = sum(phase.wall for phase in self.phases)
+        print(f"{'total':10} {total * 1000:10.2f}", file=file)
+        tokens = "-" if self.tokens is None else str(self.tokens)
+        nodes = "-" if self.nodes is None else str(self.nodes)
+        print(f"tokens {tokens}, AST nodes {nodes}", file=file)
@@ -0,0 +1,92 @@
+## TOKEN TYPE DEFINE
+# Small integers, so token types compare as ints and can index dispatch tables
+# (plain class attributes: an IntEnum makes every TokenType.X lookup slower)
+class TokenType:
+    # Single-character tokens.
+    LEFT_PAREN = 0
+    RIGHT_PAREN = 1
+    LEFT_BRACE = 2
+    RIGHT_BRACE = 3
+    COMMA = 4
+    DOT = 5
+    MINUS = 6
+    PLUS = 7
+    SEMICOLON = 8
+    SLASH = 9
+    STAR = 10
+
+    # One or two character tokens.
+    BANG = 11
+    BANG_EQUAL = 12
+    EQUAL = 13
+    EQUAL_EQUAL = 14
+    GREATER = 15
+    GREATER_EQUAL = 16
+    LESS = 17
+    LESS_EQUAL = 18
+
+    # Literals.
+    IDENTIFIER = 19
+    STRING = 20
+    NUMBER = 21
+
+    # Keywords.
+    AND = 22
+    CLASS = 23
+    ELSE = 24
+    FALSE = 25
+    FUN = 26
+    FOR = 27
+    IF = 28
+    NIL = 29
+    OR = 30
+    PUT = 31
+    RETURN = 32
+    SUPER = 33
+    THIS = 34
+    TRUE = 35
+    VAR = 36
+    WHILE = 37
+    BREAK = 38
+    CONTINUE = 39
+
+    EOF = 40
+
+# TokenType value -> name, for printing tokens
+tokenNames = {value: name for name, value in vars(TokenType).items() if not name.startswith("_")}
+
+## Reserve keywords
+keywords = {
+    "and": TokenType.AND,
+    "class": TokenType.CLASS,
+    "else": TokenType.ELSE,
+    "false": TokenType.FALSE,
+    "for": TokenType.FOR,
+    "fun": TokenType.FUN,
+    "if": TokenType.IF,
+    "nil": TokenType.NIL,
+    "or": TokenType.OR,
+    "put": TokenType.PUT,
+    "return": TokenType.RETURN,
+    "super": TokenType.SUPER,
+    "this": TokenType.THIS,
+    "true": TokenType.TRUE,
+    "var": TokenType.VAR,
+    "while": TokenType.WHILE, 
+    "break": TokenType.BREAK,
+    "continue": TokenType.CONTINUE
+}
+
+
+class Token:
+    __slots__ = ("type", "lexeme", "literal", "line")
+    
+    def __init__(self, type, lexeme, literal, line):
+        self.type = type
+        self.lexeme = lexeme
+        self.literal = literal
+        self.line = line
+    
+    def __str__(self):
+        return f"{tokenNames[self.type]} {self.lexeme} {self.literal}"
+    
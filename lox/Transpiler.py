@@ -0,0 +1,388 @@
+import math
+from Expr import ExprVisitor, Binary, Unary, Literal, Grouping, Assign, Call, Variable
+from Stmt import StmtVisitor
+from Token import TokenType
+from Callable import LoxCallable
+from Environment import LOX_RuntimeError
+from Rope import isString, concat, flattenAll
+
+
+## Function object wrapping a transpiled `def`
+class PythonFunction:
+    def __init__(self, name, arity, function):
+        self.name = name
+        self.arity = arity
+        self.function = function
+
+    def __str__(self):
+        return "<fn " + self.name + ">"
+
+
+comparisons = {
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+}
+
+arithmetic = {
+    TokenType.MINUS: "-",
+    TokenType.SLASH: "/",
+    TokenType.STAR: "*",
+}
+
+# CPython refuses more than 20 nested loops in one function ("too many
+# statically nested blocks") and about 100 levels of indentation
+PYTHON_MAX_LOOPS = 20
+PYTHON_MAX_INDENT = 90
+
+# Raised when the program is nested deeper than CPython can compile
+class NestingError(Exception):
+    pass
+
+
+## Transpiler (Stmt list -> Python source run through compile())
+# Lox locals become Python locals renamed to `<name>_<n>` so that shadowing
+# and block scopes survive Python's function-level scoping; globals live in
+# the dict G shared with the Interpreter. Anything that can fail at runtime
+# refers to its token by index, so errors still report the Lox line.
+# A function body runs inside `while True:`, so that `return f(...)` inside
+# f assigns the parameters and starts over instead of calling f again, and
+# inside a try that turns Python's RecursionError into a Lox runtime error.
+class Transpiler(ExprVisitor, StmtVisitor):
+
+    def __init__(self):
+        self.lines = []
+        self.indent = 1
+        self.loops = 0 # loops around the code being emitted, in the current def
+        self.inFunction = False
+        self.function = None # (Function statement, def name, parameters) being transpiled
+        self.tailFlag = None # set by a tail call to leave the loops it is in
+        self.tailBreaks = 0  # tail calls that set tailFlag so far
+        self.scopes = []
+        self.tokens = []
+        self.counter = 0
+
+    def transpile(self, statements):
+        self.lines.append("def __script__():")
+        self.emitBody(statements)
+        return "\n".join(self.lines) + "\n"
+
+    # Emitting
+    def emit(self, line):
+        if self.indent > PYTHON_MAX_INDENT: raise NestingError()
+        self.lines.append("    " * self.indent + line)
+
+    def emitBody(self, statements):
+        start = len(self.lines)
+        for statement in statements:
+            statement.accept(self)
+        if len(self.lines) == start:
+            self.emit("pass")
+
+    def fresh(self, name):
+        self.counter += 1
+        return name + str(self.counter)
+
+    def token(self, token):
+        self.tokens.append(token)
+        return len(self.tokens) - 1
+
+    # Scopes
+    def declare(self, name):
+        local = self.fresh(name.lexeme + "_")
+        self.scopes[-1][name.lexeme] = local
+        return local
+
+    def resolveLocal(self, name):
+        for scope in reversed(self.scopes):
+            local = scope.get(name.lexeme)
+            if local is not None: return local
+        return None
+
+    def assignTarget(self, name):
+        if self.scopes:
+            return self.declare(name)
+        return "G[" + repr(name.lexeme) + "]"
+
+    def condition(self, expr):
+        # Comparisons and `!` already produce a bool, which Python tests the
+        # same way Lox does; anything else goes through the nil/false check
+        while isinstance(expr, Grouping):
+            expr = expr.expression
+        if isinstance(expr, Binary) and (expr.operator.type in comparisons or expr.operator.type in (TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL)):
+            return expr.accept(self)
+        if isinstance(expr, Unary) and expr.operator.type == TokenType.BANG:
+            return expr.accept(self)
+        if isinstance(expr, Literal) and isinstance(expr.value, bool):
+            return repr(expr.value)
+        temp = self.fresh("__t")
+        return f"(({temp} := {expr.accept(self)}) is not None and {temp} is not False)"
+
+    # Visitor patterns (statements)
+    def visit_block_stmt(self, stmt):
+        self.scopes.append({})
+        self.emitBody(stmt.statements)
+        self.scopes.pop()
+
+    def visit_expression_stmt(self, stmt):
+        if isinstance(stmt.expression, Assign):
+            self.assignStatement(stmt.expression)
+        else:
+            self.emit(stmt.expression.accept(self))
+
+    def visit_function_stmt(self, stmt):
+        function = self.fresh("__fn")
+        enclosing = self.scopes, self.indent, self.loops, self.inFunction, self.function, self.tailFlag, self.tailBreaks
+        self.scopes = [{}]
+        self.loops = 1 # the one a tail call starts over with
+        self.inFunction = True
+        self.tailFlag = None
+        params = [self.declare(param) for param in stmt.params]
+        self.function = (stmt, function, params)
+        self.emit(f"def {function}({', '.join(params)}):")
+        self.indent += 1
+        self.emit("try:")
+        self.indent += 1
+        self.emit("while True:")
+        self.indent += 1
+        start = len(self.lines)
+        self.emitBody(stmt.body)
+        self.emit("return None")
+        if self.tailFlag is not None:
+            self.lines.insert(start, "    " * self.indent + f"{self.tailFlag} = False")
+        # Python's stack ran out in the innermost call (see LoxFunction.call)
+        self.indent -= 2
+        self.emit("except RecursionError:")
+        self.emit(f"    __overflow({self.token(stmt.name)})")
+        self.scopes, self.indent, self.loops, self.inFunction, self.function, self.tailFlag, self.tailBreaks = enclosing
+        target = self.assignTarget(stmt.name)
+        self.emit(f"{target} = __PythonFunction({stmt.name.lexeme!r}, {len(stmt.params)}, {function})")
+
+    def visit_if_stmt(self, stmt):
+        self.emit(f"if {self.condition(stmt.condition)}:")
+        self.indent += 1
+        self.emitBody([stmt.thenBranch])
+        self.indent -= 1
+        if stmt.elseBranch is not None:
+            self.emit("else:")
+            self.indent += 1
+            self.emitBody([stmt.elseBranch])
+            self.indent -= 1
+
+    def visit_put_stmt(self, stmt):
+        self.emit(f"__print(__stringify({stmt.expression.accept(self)}))")
+
+    def visit_return_stmt(self, stmt):
+        call = self.selfCall(stmt.value)
+        if call is not None:
+            self.tailCall(call)
+            return
+        value = "None" if stmt.value is None else stmt.value.accept(self)
+        # __script__ returns a completion, as Interpreter.interpret does
+        self.emit(f"return {value}" if self.inFunction else f"return ({value},)")
+
+    def selfCall(self, expr):
+        # `return f(...)` inside f, f being a global and the number of
+        # arguments right (see Resolver.selfCall)
+        while isinstance(expr, Grouping):
+            expr = expr.expression
+        if self.function is None or not isinstance(expr, Call): return None
+        stmt, _, params = self.function
+        callee = expr.callee
+        if not isinstance(callee, Variable) or callee.name.lexeme != stmt.name.lexeme: return None
+        if self.resolveLocal(callee.name) is not None or len(expr.arguments) != len(params): return None
+        return expr
+
+    def tailCall(self, expr):
+        # The name is looked up again on every call: when it still holds this
+        # def, the arguments become the parameters and the body starts over,
+        # leaving the loops around the call through tailFlag
+        _, function, params = self.function
+        callee = self.fresh("__t")
+        self.emit(f"{callee} = {expr.callee.accept(self)}")
+        arguments = []
+        for argument in expr.arguments:
+            arguments.append(self.fresh("__t"))
+            self.emit(f"{arguments[-1]} = {argument.accept(self)}")
+        self.emit(f"if {callee}.__class__ is __PythonFunction and {callee}.function is {function}:")
+        self.indent += 1
+        for param, argument in zip(params, arguments):
+            self.emit(f"{param} = {argument}")
+        if self.loops == 1:
+            self.emit("continue")
+        else:
+            if self.tailFlag is None: self.tailFlag = self.fresh("__tail")
+            self.emit(f"{self.tailFlag} = True")
+            self.emit("break")
+            self.tailBreaks += 1
+        self.indent -= 1
+        token = self.token(expr.paren)
+        self.emit(f"return ({callee}.function if {callee}.__class__ is __PythonFunction and {callee}.arity == {len(arguments)} else __callable({token}, {callee}, {len(arguments)}))({', '.join(arguments)})")
+
+    def visit_var_stmt(self, stmt):
+        # The initializer is translated before the name is declared,
+        # so it still sees the outer binding
+        value = "None" if stmt.initializer is None else stmt.initializer.accept(self)
+        self.emit(f"{self.assignTarget(stmt.name)} = {value}")
+
+    def visit_while_stmt(self, stmt):
+        self.loops += 1
+        # the try around a function body counts as a block too
+        if self.loops + self.inFunction > PYTHON_MAX_LOOPS: raise NestingError()
+        tailBreaks = self.tailBreaks
+        self.emit(f"while {self.condition(stmt.condition)}:")
+        self.indent += 1
+        self.emitBody([stmt.body])
+        self.indent -= 1
+        self.loops -= 1
+        if self.tailBreaks != tailBreaks:
+            # a tail call inside: on to the next loop out, or start over
+            self.emit(f"if {self.tailFlag}: {'continue' if self.loops == 1 else 'break'}")
+
+    # Visitor patterns (expressions)
+    def assignStatement(self, expr):
+        value = expr.value.accept(self)
+        local = self.resolveLocal(expr.name)
+        if local is not None:
+            self.emit(f"{local} = {value}")
+            return
+        temp = self.fresh("__t")
+        name = repr(expr.name.lexeme)
+        self.emit(f"{temp} = {value}")
+        self.emit(f"if {name} not in G: __undefined({self.token(expr.name)})")
+        self.emit(f"G[{name}] = {temp}")
+
+    def visit_assign_expr(self, expr):
+        value = expr.value.accept(self)
+        local = self.resolveLocal(expr.name)
+        if local is not None:
+            return f"({local} := {value})"
+        return f"__assignGlobal({self.token(expr.name)}, {value})"
+
+    def visit_binary_expr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        type = expr.operator.type
+        if type == TokenType.EQUAL_EQUAL:
+            return f"({left} == {right})"
+        if type == TokenType.BANG_EQUAL:
+            return f"({left} != {right})"
+        a, b = self.fresh("__t"), self.fresh("__t")
+        # `&` and `|` evaluate both sides, so the right operand is always
+        # evaluated before the type check, as in the Interpreter
+        numbers = f"(({a} := {left}).__class__ is float) & (({b} := {right}).__class__ is float)"
+        token = self.token(expr.operator)
+        if type == TokenType.PLUS:
+            return f"({a} + {b} if {numbers} else __concat({a}, {b}, {token}))"
+        op = comparisons.get(type) or arithmetic[type]
+        return f"({a} {op} {b} if {numbers} else __error({token}, 'Operands mush be numbers'))"
+
+    def visit_call_expr(self, expr):
+        callee = self.fresh("__t")
+        arguments = [argument.accept(self) for argument in expr.arguments]
+        token = self.token(expr.paren)
+        # Only the callee is checked before the call; __callable hands back a
+        # function that raises (or calls the native) once the arguments have
+        # been evaluated, matching the Interpreter's order of evaluation
+        function = f"({callee}.function if ({callee} := {expr.callee.accept(self)}).__class__ is __PythonFunction and {callee}.arity == {len(arguments)} else __callable({token}, {callee}, {len(arguments)}))"
+        return f"{function}({', '.join(arguments)})"
+
+    def visit_grouping_expr(self, expr):
+        return expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        value = expr.value
+        # repr() of inf and nan is a bare name, so they come from the namespace
+        if value.__class__ is float and not math.isfinite(value):
+            if value != value: return "__nan"
+            return "__inf" if value > 0 else "(-__inf)"
+        return repr(value)
+
+    def visit_logical_expr(self, expr):
+        temp = self.fresh("__t")
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        truthy = f"(({temp} := {left}) is not None and {temp} is not False)"
+        if expr.operator.type == TokenType.OR:
+            return f"({temp} if {truthy} else {right})"
+        return f"({right} if {truthy} else {temp})"
+
+    def visit_unary_expr(self, expr):
+        temp = self.fresh("__t")
+        right = expr.right.accept(self)
+        if expr.operator.type == TokenType.MINUS:
+            return f"(-{temp} if ({temp} := {right}).__class__ is float else __error({self.token(expr.operator)}, 'Operand must be a number.'))"
+        return f"(({temp} := {right}) is None or {temp} is False)"
+
+    def visit_variable_expr(self, expr):
+        local = self.resolveLocal(expr.name)
+        if local is not None:
+            return local
+        name = repr(expr.name.lexeme)
+        return f"(G[{name}] if {name} in G else __undefined({self.token(expr.name)}))"
+
+
+## Compile the transpiled source and run it against the Interpreter's globals
+# Returns the completion of a top-level `return` (None without one), or
+# False, before anything has run, when CPython cannot compile the program
+# (nested too deeply); the caller runs it on another engine then.
+def runPython(statements, interpreter):
+    transpiler = Transpiler()
+    try:
+        source = transpiler.transpile(statements)
+        code = compile(source, "<lox>", "exec")
+    except (NestingError, SyntaxError, RecursionError, MemoryError):
+        return False
+    tokens = transpiler.tokens
+    globals = interpreter.globals.own()
+
+    def error(index, message):
+        raise LOX_RuntimeError(tokens[index], message)
+
+    def overflow(index):
+        raise LOX_RuntimeError(tokens[index], "Stack overflow.")
+
+    def undefined(index):
+        name = tokens[index]
+        raise LOX_RuntimeError(name, "Undefined variable '" + name.lexeme + "'.")
+
+    def concatenate(left, right, index):
+        if isString(left) and isString(right): return concat(left, right)
+        error(index, 'Operand must be two numbers or two strings')
+
+    def assignGlobal(index, value):
+        if tokens[index].lexeme not in globals: undefined(index)
+        globals[tokens[index].lexeme] = value
+        return value
+
+    def callable(index, callee, argCount):
+        def call(*arguments):
+            paren = tokens[index]
+            if callee.__class__ is PythonFunction:
+                arity = callee.arity
+            elif isinstance(callee, LoxCallable):
+                arity = callee.arity()
+            else:
+                raise LOX_RuntimeError(paren, "Can only call functions and classes. ")
+            if argCount != arity:
+                raise LOX_RuntimeError(paren, "Expected " + str(arity) + " arguments but got " + str(argCount) + ".")
+            return callee.call(interpreter, flattenAll(arguments))
+        return call
+
+    namespace = {
+        "G": globals,
+        "__PythonFunction": PythonFunction,
+        "__print": interpreter.output.write,
+        "__stringify": interpreter.stringify,
+        "__error": error,
+        "__concat": concatenate,
+        "__undefined": undefined,
+        "__overflow": overflow,
+        "__assignGlobal": assignGlobal,
+        "__callable": callable,
+        "__inf": math.inf,
+        "__nan": math.nan,
+    }
+    exec(code, namespace)
+    return namespace["__script__"]()
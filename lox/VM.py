@@ -0,0 +1,169 @@
+from Callable import LoxCallable
+from Compiler import OpCode, Chunk
+from Environment import LOX_RuntimeError
+from Rope import isString, concat, flattenAll
+
+# Opcodes as plain locals for the dispatch loop
+CONSTANT, NIL, TRUE, FALSE, POP = OpCode.CONSTANT, OpCode.NIL, OpCode.TRUE, OpCode.FALSE, OpCode.POP
+GET_LOCAL, SET_LOCAL = OpCode.GET_LOCAL, OpCode.SET_LOCAL
+GET_GLOBAL, SET_GLOBAL, DEFINE_GLOBAL = OpCode.GET_GLOBAL, OpCode.SET_GLOBAL, OpCode.DEFINE_GLOBAL
+EQUAL, NOT_EQUAL = OpCode.EQUAL, OpCode.NOT_EQUAL
+GREATER, GREATER_EQUAL, LESS, LESS_EQUAL = OpCode.GREATER, OpCode.GREATER_EQUAL, OpCode.LESS, OpCode.LESS_EQUAL
+ADD, SUBTRACT, MULTIPLY, DIVIDE = OpCode.ADD, OpCode.SUBTRACT, OpCode.MULTIPLY, OpCode.DIVIDE
+NOT, NEGATE, PUT = OpCode.NOT, OpCode.NEGATE, OpCode.PUT
+JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE = OpCode.JUMP, OpCode.JUMP_IF_FALSE, OpCode.JUMP_IF_TRUE
+CALL, RETURN, FUNCTION = OpCode.CALL, OpCode.RETURN, OpCode.FUNCTION
+
+
+## Stack-based virtual machine running Chunks produced by the Compiler
+# Globals (and the native functions) are shared with the tree-walking
+# Interpreter, as is stringify, so both engines print the same thing.
+class VM:
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.globals = interpreter.globals
+
+    # Interperter
+    def interpret(self, chunk, lox):
+        try:
+            return self.run(chunk)
+        except LOX_RuntimeError as error:
+            lox.errorRuntime(error)
+            return None
+
+    def run(self, chunk):
+        globals = self.globals.own()
+        stringify = self.interpreter.stringify
+        write = self.interpreter.output.write
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        frames = [] # saved (code, constants, ip, slots) of the callers
+
+        code = chunk.code
+        constants = chunk.constants
+        slots = [None] * chunk.frameSize
+        ip = 0
+
+        while True:
+            op = code[ip]
+            ip += 1
+
+            if op == GET_LOCAL:
+                push(slots[code[ip]])
+                ip += 1
+            elif op == CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif op == POP:
+                pop()
+            elif op == JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+            elif op == JUMP:
+                ip = code[ip]
+            elif op == SET_LOCAL:
+                slots[code[ip]] = stack[-1]
+                ip += 1
+            elif op == GET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name.lexeme not in globals:
+                    raise LOX_RuntimeError(name, "Undefined variable '" + name.lexeme + "'.")
+                push(globals[name.lexeme])
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                if isinstance(left, float) and isinstance(right, float):
+                    stack[-1] = left + right
+                elif isString(left) and isString(right):
+                    stack[-1] = concat(left, right)
+                else:
+                    raise LOX_RuntimeError(constants[code[ip]], "Operand must be two numbers or two strings")
+                ip += 1
+            elif op == SUBTRACT or op == MULTIPLY or op == DIVIDE or op == GREATER or op == GREATER_EQUAL or op == LESS or op == LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, float) and isinstance(right, float)):
+                    raise LOX_RuntimeError(constants[code[ip]], "Operands mush be numbers")
+                ip += 1
+                if op == SUBTRACT: stack[-1] = left - right
+                elif op == LESS: stack[-1] = left < right
+                elif op == LESS_EQUAL: stack[-1] = left <= right
+                elif op == GREATER: stack[-1] = left > right
+                elif op == GREATER_EQUAL: stack[-1] = left >= right
+                elif op == MULTIPLY: stack[-1] = left * right
+                else: stack[-1] = left / right
+            elif op == CALL:
+                argCount = code[ip]
+                paren = constants[code[ip + 1]]
+                ip += 2
+                callee = stack[-1 - argCount]
+                if callee.__class__ is Chunk:
+                    if argCount != callee.arity:
+                        raise LOX_RuntimeError(paren, "Expected " + str(callee.arity) + " arguments but got " + str(argCount) + ".")
+                    frames.append((code, constants, ip, slots))
+                    slots = stack[len(stack) - argCount:]
+                    slots.extend([None] * (callee.frameSize - argCount))
+                    del stack[len(stack) - argCount - 1:]
+                    code = callee.code
+                    constants = callee.constants
+                    ip = 0
+                elif isinstance(callee, LoxCallable):
+                    if argCount != callee.arity():
+                        raise LOX_RuntimeError(paren, "Expected " + str(callee.arity()) + " arguments but got " + str(argCount) + ".")
+                    arguments = stack[len(stack) - argCount:]
+                    del stack[len(stack) - argCount - 1:]
+                    push(callee.call(self.interpreter, flattenAll(arguments)))
+                else:
+                    raise LOX_RuntimeError(paren, "Can only call functions and classes. ")
+            elif op == RETURN:
+                if not frames:
+                    # the script's own RETURN is the last instruction; any
+                    # other one is a top-level `return`
+                    return None if ip == len(code) else (pop(),)
+                code, constants, ip, slots = frames.pop()
+            elif op == EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] == right
+            elif op == NOT_EQUAL:
+                right = pop()
+                stack[-1] = not stack[-1] == right
+            elif op == JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += 1
+                else:
+                    ip = code[ip]
+            elif op == SET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name.lexeme not in globals:
+                    raise LOX_RuntimeError(name, "Undefined variable '" + name.lexeme + "'.")
+                globals[name.lexeme] = stack[-1]
+            elif op == NIL:
+                push(None)
+            elif op == TRUE:
+                push(True)
+            elif op == FALSE:
+                push(False)
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif op == NEGATE:
+                if not isinstance(stack[-1], float):
+                    raise LOX_RuntimeError(constants[code[ip]], "Operand must be a number.")
+                stack[-1] = -stack[-1]
+                ip += 1
+            elif op == PUT:
+                write(stringify(pop()))
+            elif op == DEFINE_GLOBAL:
+                globals[constants[code[ip]]] = pop()
+                ip += 1
+            elif op == FUNCTION:
+                push(constants[code[ip]])
+                ip += 1
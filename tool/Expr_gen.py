@@ -5,11 +5,19 @@ class GenerateAst:
         pass
     
     def defineType(self, writer, baseName, className, fields):
+        # fields after "|" are not constructor arguments, they start out as
+        # None and are filled in by the interpreter (e.g. inline caches)
+        fields, _, extra = fields.partition("|")
+        fields = fields.strip()
+        field_names = fields.split(", ")
+        extra_names = extra.split() if extra else []
         writer.write(f"class {className}({baseName}):\n")
+        writer.write(f"\t__slots__ = {tuple(field_names + extra_names)!r}\n")
         writer.write(f"\tdef __init__(self, {fields}):\n")
-        field_names = fields.split(", ")
         for field in field_names:
             writer.write(f"\t\tself.{field} = {field}\n")
+        for field in extra_names:
+            writer.write(f"\t\tself.{field} = None\n")
         writer.write(f"\tdef accept(self, visitor):\n")
         writer.write(f"\t\treturn visitor.visit_{className.lower()}_{baseName.lower()}(self)\n\n")
         
@@ -27,6 +35,7 @@ class GenerateAst:
             with open(path, "w", encoding="UTF-8") as writer:
                 writer.write(f"from abc import ABC, abstractmethod\n\n")
                 writer.write(f"class {baseName}(ABC):\n")
+                writer.write(f"\t__slots__ = ()\n")
                 writer.write(f"\t@abstractmethod\n")
                 writer.write(f"\tdef accept(self, visitor):\n")
                 writer.write(f"\t\tpass\n\n")
@@ -53,7 +62,7 @@ class GenerateAst:
                                             "Literal  : value",
                                             "Logical  : left, operator, right",
                                             "Unary    : operator, right", 
-                                            "Variable : name"])
+                                            "Variable : name | cache"])
         
         self.defineAst(output_dir, "Stmt", ["Block      : statements",
                                             "Expression : expression",